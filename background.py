@@ -0,0 +1,166 @@
+# background.py
+import os
+import tempfile
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from checkpoint import save_checkpoint
+
+# Header words (int64) at the start of the shared block
+LATEST = 0      # Slot holding the newest complete snapshot, -1 before the first
+STOP = 1        # Set by the front end to end the run early
+DONE = 2        # Set by the worker once it has stopped stepping
+CHECKPOINT = 3  # Set by the front end to request a checkpoint
+SEQ = 4         # SEQ + slot: per-slot sequence number, odd while the slot is being written
+HEADER_WORDS = 8
+
+# Per-slot scalars stored before the particle arrays
+META_FIELDS = ('step', 'time', 'temperature', 'pressure')
+
+
+class SnapshotBuffer:
+    """Double-buffered particle snapshots in one multiprocessing.shared_memory block.
+
+    The writer always fills the slot that is not the latest one and then flips
+    LATEST, so a complete snapshot is available at all times. Readers copy the latest
+    slot and check its sequence number afterwards (a seqlock); if the writer came
+    round to that slot in the meantime the read is simply repeated.
+    """
+
+    def __init__(self, num_particles, name=None):
+        slot_size = len(META_FIELDS) + 4 * num_particles
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=8 * (HEADER_WORDS + 2 * slot_size))
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.header = np.ndarray((HEADER_WORDS,), dtype=np.int64, buffer=self.shm.buf)
+        slots = np.ndarray((2, slot_size), dtype=float, buffer=self.shm.buf, offset=8 * HEADER_WORDS)
+        fields = len(META_FIELDS)
+        self.meta = slots[:, :fields]
+        self.positions = slots[:, fields:fields + 2 * num_particles].reshape(2, num_particles, 2)
+        self.velocities = slots[:, fields + 2 * num_particles:].reshape(2, num_particles, 2)
+        if self.owner:
+            self.header[:] = 0
+            self.header[LATEST] = -1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, step, time, temperature, pressure, positions, velocities):
+        header = self.header
+        slot = 1 if header[LATEST] == 0 else 0
+        seq = header[SEQ + slot]
+        header[SEQ + slot] = seq + 1
+        self.meta[slot] = (step, time, temperature, pressure)
+        np.copyto(self.positions[slot], positions)
+        np.copyto(self.velocities[slot], velocities)
+        header[SEQ + slot] = seq + 2
+        header[LATEST] = slot
+
+    def read(self, positions, velocities):
+        """Copy the newest complete snapshot into the given arrays and return its META_FIELDS, or None."""
+        header = self.header
+        while True:
+            slot = int(header[LATEST])
+            if slot < 0:
+                return None
+            seq = header[SEQ + slot]
+            if seq % 2:
+                continue
+            meta = self.meta[slot].copy()
+            np.copyto(positions, self.positions[slot])
+            np.copyto(velocities, self.velocities[slot])
+            if header[SEQ + slot] == seq:
+                return meta
+
+    def close(self):
+        # Views into the block must go before it can be closed
+        self.header = self.meta = self.positions = self.velocities = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def physics_worker(state_path, options, shm_name, connection):
+    """Step a simulation restored from `state_path`, publishing every step to the shared buffer."""
+    from simulation import Simulation
+    simulation = Simulation.from_checkpoint(state_path, headless=True, **options)
+    os.remove(state_path)
+    buffer = SnapshotBuffer(len(simulation.store), shm_name)
+    header = buffer.header
+    store = simulation.store
+    try:
+        temperature = store.kinetic_energy() / (len(store) * simulation.kb)
+        buffer.publish(simulation.step_count, simulation.time, temperature, 0.0,
+                       store.positions, store.velocities)
+        while not simulation.finished() and not header[STOP]:
+            temperature, pressure = simulation.step()
+            buffer.publish(simulation.step_count, simulation.time, temperature, pressure,
+                           store.positions, store.velocities)
+            if header[CHECKPOINT]:
+                header[CHECKPOINT] = 0
+                if simulation.checkpoint_path:
+                    simulation.save_checkpoint()
+        if header[STOP] and simulation.checkpoint_path:
+            simulation.save_checkpoint()
+        simulation.close()
+        connection.send({'step_count': simulation.step_count, 'time': simulation.time,
+                         'stats': simulation.stats.state()})
+    finally:
+        header[DONE] = 1
+        header = None
+        buffer.close()
+        connection.close()
+
+
+class PhysicsProcess:
+    """Runs the physics of `simulation` in a separate process from its current state.
+
+    The state is handed over as a temporary checkpoint, so the worker continues exactly
+    where the front end's simulation stands. `options` are constructor overrides for
+    the worker (trajectory, spill and checkpoint files belong to it, not the front end).
+    """
+
+    def __init__(self, simulation, options=None):
+        fd, state_path = tempfile.mkstemp(suffix='.npz')
+        os.close(fd)
+        save_checkpoint(simulation, state_path)
+        self.buffer = SnapshotBuffer(len(simulation.store))
+        # Spawn rather than fork: the parent already holds a pygame display
+        context = mp.get_context('spawn')
+        self.state_path = state_path
+        self.receiver, sender = context.Pipe(duplex=False)
+        self.process = context.Process(target=physics_worker, daemon=True,
+                                       args=(state_path, options or {}, self.buffer.name, sender))
+        self.process.start()
+        sender.close()
+
+    @property
+    def done(self):
+        return bool(self.buffer.header[DONE]) or not self.process.is_alive()
+
+    def latest(self, store):
+        """Load the newest snapshot into `store`; returns (step, time, temperature, pressure) or None."""
+        return self.buffer.read(store.positions, store.velocities)
+
+    def request_checkpoint(self):
+        self.buffer.header[CHECKPOINT] = 1
+
+    def stop(self):
+        self.buffer.header[STOP] = 1
+
+    def finish(self):
+        """Wait for the worker and return its final step count, time and statistics state."""
+        try:
+            result = self.receiver.recv()
+        except EOFError:
+            result = None
+        self.process.join()
+        self.buffer.close()
+        if os.path.exists(self.state_path):
+            os.remove(self.state_path)
+        if result is None:
+            raise RuntimeError(f'physics process exited with code {self.process.exitcode}')
+        return result
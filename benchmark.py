@@ -0,0 +1,239 @@
+# benchmark.py
+"""Headless timings of the simulation hot paths, compared against a stored baseline.
+
+    python benchmark.py --save-baseline          # record this machine's baseline
+    python benchmark.py                          # compare against it
+    python benchmark.py --precision float32      # time the single-precision state
+    python benchmark.py --precision-drift        # float32 against float64 over several seeds
+    python benchmark.py --check                  # physics checks; exits non-zero on failure
+
+Every case uses a fixed seed, so two runs time exactly the same work. Baselines are
+machine-specific and are not committed.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import numpy as np
+
+BASELINE_PATH = 'benchmark_baseline.json'
+SIZES = (100, 1000, 10000, 100000)
+PACKINGS = (0.05, 0.2)   # Area fraction covered by discs
+BOX_SIZE = 1000
+SEED = 12345
+LOD_THRESHOLD = 50000    # Same switch-over to the density view as Simulation
+
+
+def radius_for(num_particles, packing, box_size=BOX_SIZE):
+    """Disc radius that gives `packing` area fraction for `num_particles` in the box."""
+    return float(np.sqrt(packing * box_size ** 2 / (num_particles * np.pi)))
+
+
+def measure(func, min_time=0.2, min_repeats=3, max_repeats=200):
+    """Call `func` until `min_time` has passed (within the repeat limits); seconds per call."""
+    times = []
+    start = time.perf_counter()
+    while len(times) < max_repeats and (len(times) < min_repeats or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - t0)
+    times = np.array(times)
+    return {'median': float(np.median(times)), 'min': float(times.min()), 'repeats': len(times)}
+
+
+def bench_case(num_particles, packing, min_time=0.2, warmup=5, precision='float64'):
+    """Time initialization, one full step, collision handling alone and rendering."""
+    import pygame
+    from simulation import Simulation
+    from rendering import SpriteRenderer, DensityRenderer
+
+    radius = radius_for(num_particles, packing)
+    params = dict(num_particles=num_particles, box_size=BOX_SIZE, particle_radius=radius, temperature=1.0,
+                  dt=0.5, total_steps=1000, headless=True, seed=SEED, history=100, precision=precision)
+    results = {}
+
+    # Each construction places and seeds the same particles
+    results['init'] = measure(lambda: Simulation(**params), min_time, min_repeats=3, max_repeats=20)
+
+    simulation = Simulation(**params)
+    for _ in range(warmup):
+        simulation.step()
+    results['step'] = measure(simulation.step, min_time)
+    results['collisions'] = measure(simulation.handle_particle_collisions, min_time)
+
+    surface = pygame.Surface((BOX_SIZE, BOX_SIZE))
+    if num_particles > LOD_THRESHOLD:
+        renderer = DensityRenderer(BOX_SIZE, (BOX_SIZE, BOX_SIZE))
+    else:
+        renderer = SpriteRenderer()
+    results['render'] = measure(lambda: renderer.draw(surface, simulation.store), min_time)
+    return results
+
+
+def run_benchmarks(sizes=SIZES, packings=PACKINGS, min_time=0.2, log=print, precision='float64'):
+    cases = []
+    for num_particles in sizes:
+        for packing in packings:
+            timings = bench_case(num_particles, packing, min_time, precision=precision)
+            cases.append({'num_particles': num_particles, 'packing': packing, 'timings': timings})
+            if log:
+                log(f"N={num_particles:>7} packing={packing:<5} " +
+                    ' '.join(f"{name}={t['median'] * 1e3:9.3f}ms" for name, t in timings.items()))
+    return {
+        'machine': {'python': platform.python_version(), 'numpy': np.__version__,
+                    'platform': platform.platform(), 'processor': platform.processor()},
+        'seed': SEED,
+        'box_size': BOX_SIZE,
+        'precision': precision,
+        'cases': cases,
+    }
+
+
+def energy_conservation(num_particles=400, box_size=400, radius=4, dt=0.5, steps=2000, seeds=(0, 1, 2),
+                        tolerance=1e-10):
+    """Check that a dense fixed-dt run keeps its kinetic energy to rounding.
+
+    Pair collisions and wall reflections are elastic, so any drift beyond rounding
+    means collisions were resolved from stale velocities (for example a particle
+    touching several others at once). `tolerance` is on |KE_end / KE_start - 1|.
+    """
+    from simulation import Simulation
+    drifts = []
+    for seed in seeds:
+        simulation = Simulation(num_particles, box_size, radius, 1.0, dt, steps, headless=True, seed=seed)
+        start = simulation.store.kinetic_energy()
+        simulation.run()
+        drifts.append(simulation.store.kinetic_energy() / start - 1)
+    worst = float(np.max(np.abs(drifts)))
+    return {'drifts': [float(d) for d in drifts], 'tolerance': tolerance, 'passed': worst <= tolerance}
+
+
+def run_checks():
+    checks = {'energy_conservation': energy_conservation(), 'precision_drift': precision_drift()}
+    return checks, all(check['passed'] for check in checks.values())
+
+
+def precision_drift(num_particles=1000, packing=0.05, dt=0.1, steps=2000, seeds=(1, 2, 3), drift_bound=1e-6,
+                    k=3.0):
+    """Check that float32 runs agree with float64 on energy drift and mean pressure.
+
+    Each seed runs in both precisions. `energy_drift` is the relative change of the
+    kinetic energy over the run; the float32 drift must stay within `drift_bound`
+    of the float64 drift for every seed. The trajectories decorrelate chaotically
+    after a few hundred steps, so pressures are compared statistically: the
+    seed-averaged block means must agree within `k` combined standard errors.
+    Measured on the defaults, float64 holds the energy to about 1e-16 and float32
+    to 1e-8 to 6e-8, and the pooled pressures differ by well under one standard error.
+    """
+    from simulation import Simulation
+    radius = radius_for(num_particles, packing)
+    runs = {'float64': [], 'float32': []}
+    for seed in seeds:
+        for precision, results in runs.items():
+            simulation = Simulation(num_particles, BOX_SIZE, radius, 1.0, dt, steps, headless=True, seed=seed,
+                                    precision=precision)
+            start_energy = simulation.store.kinetic_energy()
+            start = time.perf_counter()
+            simulation.run()
+            results.append({
+                'seed': seed,
+                'energy_drift': float(simulation.store.kinetic_energy() / start_energy - 1),
+                'mean_pressure': float(simulation.stats.blocks.mean[1]),
+                'pressure_error': float(simulation.stats.blocks.standard_error[1]),
+                'seconds': time.perf_counter() - start,
+            })
+
+    report = dict(runs)
+    drift_ok = all(abs(single['energy_drift'] - double['energy_drift']) <= drift_bound
+                   for single, double in zip(runs['float32'], runs['float64']))
+    pooled = {}
+    for precision, results in runs.items():
+        pooled[precision] = (np.mean([r['mean_pressure'] for r in results]),
+                             np.sqrt(np.sum([r['pressure_error'] ** 2 for r in results])) / len(results))
+    difference = abs(pooled['float32'][0] - pooled['float64'][0])
+    allowed = k * float(np.hypot(pooled['float32'][1], pooled['float64'][1]))
+    report.update(drift_bound=drift_bound, pressure_difference=float(difference), pressure_allowed=allowed,
+                  passed=bool(drift_ok and difference <= allowed))
+    return report
+
+
+def compare(results, baseline, threshold=1.2):
+    """Median-time ratios against the baseline; rows slower than `threshold` are regressions."""
+    reference = {(case['num_particles'], case['packing']): case['timings'] for case in baseline['cases']}
+    rows = []
+    for case in results['cases']:
+        base = reference.get((case['num_particles'], case['packing']))
+        if base is None:
+            continue
+        for name, timing in case['timings'].items():
+            if name in base:
+                ratio = timing['median'] / base[name]['median']
+                rows.append({'num_particles': case['num_particles'], 'packing': case['packing'], 'metric': name,
+                             'baseline': base[name]['median'], 'current': timing['median'], 'ratio': ratio,
+                             'regression': ratio > threshold})
+    return rows
+
+
+def format_report(rows, threshold):
+    lines = [f"{'N':>7} {'packing':>7} {'metric':>10} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}"]
+    for row in rows:
+        flag = '  REGRESSION' if row['regression'] else ''
+        lines.append(f"{row['num_particles']:>7} {row['packing']:>7} {row['metric']:>10} "
+                     f"{row['baseline'] * 1e3:>12.3f} {row['current'] * 1e3:>12.3f} {row['ratio']:>7.2f}{flag}")
+    regressions = sum(row['regression'] for row in rows)
+    lines.append(f"{regressions} of {len(rows)} timings slower than {threshold:.2f}x baseline")
+    return '\n'.join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the ideal gas simulation hot paths.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES))
+    parser.add_argument('--packings', type=float, nargs='+', default=list(PACKINGS))
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds spent timing each measurement')
+    parser.add_argument('--precision', choices=('float64', 'float32'), default='float64')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    parser.add_argument('--precision-drift', action='store_true',
+                        help='only check float32 runs against float64; exit non-zero if they disagree')
+    parser.add_argument('--check', action='store_true',
+                        help='only run the physics checks; exit non-zero if one fails')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='report timings slower than THRESHOLD times the baseline')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    if args.precision_drift:
+        report = precision_drift()
+        print(json.dumps(report, indent=2))
+        return 0 if report['passed'] else 1
+    if args.check:
+        checks, passed = run_checks()
+        print(json.dumps(checks, indent=2))
+        return 0 if passed else 1
+    results = run_benchmarks(args.sizes, args.packings, args.min_time, precision=args.precision)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline first")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare(results, baseline, args.threshold)
+    print(format_report(rows, args.threshold))
+    return 1 if any(row['regression'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,82 @@
+# checkpoint.py
+import json
+import os
+import tempfile
+import numpy as np
+
+CHECKPOINT_VERSION = 2
+
+
+def rng_state(rng):
+    """JSON-serialisable state of a numpy Generator or of the global np.random module."""
+    if rng is np.random:
+        name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+        return {'legacy': [name, keys.tolist(), pos, has_gauss, cached_gaussian]}
+    return {'generator': rng.bit_generator.state}
+
+
+def restore_rng_state(rng, state):
+    if 'legacy' in state:
+        name, keys, pos, has_gauss, cached_gaussian = state['legacy']
+        np.random.set_state((name, np.array(keys, dtype=np.uint32), pos, has_gauss, cached_gaussian))
+    else:
+        rng.bit_generator.state = state['generator']
+
+
+def save_checkpoint(simulation, path):
+    """Write the full simulation state to `path` atomically.
+
+    The arrays go into a compressed .npz written to a temporary file in the same
+    directory, which then replaces `path` in one step, so an interrupted save never
+    leaves a truncated checkpoint behind.
+    """
+    store = simulation.store
+    meta = {
+        'version': CHECKPOINT_VERSION,
+        'params': simulation.params,
+        'step_count': simulation.step_count,
+        'time': simulation.time,
+        'rng': rng_state(simulation.rng),
+    }
+    arrays = {
+        'meta': np.array(json.dumps(meta)),
+        'positions': store.positions,
+        'velocities': store.velocities,
+        'masses': store.masses,
+        'radii': store.radii,
+    }
+    for prefix, component in (('stats', simulation.stats), ('collider', simulation.collider),
+                              ('events', simulation.events), ('pressure', simulation.pressure),
+                              ('recorder', simulation.recorder)):
+        if component is not None:
+            arrays.update({f'{prefix}/{key}': value for key, value in component.state().items()})
+    if simulation.recorder is None:
+        # A background front end passes the restored frame index on to its worker
+        arrays.update({f'recorder/{key}': value for key, value in simulation.recorder_state.items()})
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_checkpoint(path):
+    """Return (meta, arrays) with arrays grouped by component prefix."""
+    with np.load(path) as data:
+        meta = json.loads(str(data['meta']))
+        if meta.get('version') != CHECKPOINT_VERSION:
+            raise ValueError(f"{path} has unsupported checkpoint version {meta.get('version')}")
+        arrays = {'store': {}, 'stats': {}, 'collider': {}, 'events': {}, 'pressure': {}, 'recorder': {}}
+        for key in data.files:
+            if key == 'meta':
+                continue
+            prefix, _, name = key.rpartition('/')
+            arrays[prefix or 'store'][name] = data[key]
+    return meta, arrays
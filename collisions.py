@@ -0,0 +1,312 @@
+# collisions.py
+import numpy as np
+
+# Offsets covering each neighbouring cell pair exactly once (the cell itself plus half its neighbours)
+HALF_NEIGHBOURS = ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1))
+
+
+def index_dtype(size):
+    """Narrowest integer type that can index `size` elements: int32 where it fits."""
+    return np.int32 if size < 2 ** 31 else np.int64
+
+
+class CellList:
+    """Bins particles into cells and produces candidate pairs in bulk.
+
+    `box_size` is the side of the square box, or a (width, height) pair for a
+    rectangular region such as one slab of a domain decomposition. Cells are sized
+    from the interaction range (or `min_cell_size` if that is larger). With
+    `periodic`, neighbour cells wrap around the box edges.
+
+    Binning is done in the dtype of the positions, and cell ids, sort order and the
+    returned pair indices are int32 while they fit, so a float32 state makes no
+    float64 or int64 temporaries per particle.
+    """
+
+    def __init__(self, box_size, periodic=False, min_cell_size=None):
+        self.box_size = box_size
+        self.extent = np.broadcast_to(np.asarray(box_size, dtype=float), (2,)).copy()
+        self.periodic = periodic
+        self.min_cell_size = min_cell_size
+        self.grid_shape = (1, 1)
+        self.cell_size = self.extent.copy()
+
+    @property
+    def grid_size(self):
+        return self.grid_shape[0]
+
+    def resize(self, interaction_range, num_particles):
+        # Cells must be at least as wide as the interaction range; cap the
+        # grid at a few cells per particle so huge boxes don't allocate empty cells
+        width = max(interaction_range, self.min_cell_size or 0.0, 1e-12)
+        aspect = self.extent[0] / self.extent[1]
+        shape = []
+        for extent, stretch in zip(self.extent, (aspect, 1 / aspect)):
+            max_grid = max(1, int(np.sqrt(4 * max(num_particles, 1) * stretch)))
+            shape.append(int(np.clip(int(extent // width), 1, max_grid)))
+        if self.periodic and min(shape) < 3:
+            # Wrapped half-neighbour offsets would visit the same cell twice
+            shape = [1, 1]
+        self.grid_shape = tuple(shape)
+        self.cell_size = self.extent / shape
+
+    def candidate_pairs(self, positions):
+        gx, gy = self.grid_shape
+        n = len(positions)
+        itype = index_dtype(max(n, gx * gy))
+        cell_size = self.cell_size.astype(positions.dtype)
+        cells_xy = np.floor(positions / cell_size).astype(itype)
+        np.clip(cells_xy[:, 0], 0, gx - 1, out=cells_xy[:, 0])
+        np.clip(cells_xy[:, 1], 0, gy - 1, out=cells_xy[:, 1])
+        cell_ids = cells_xy[:, 0] * gy + cells_xy[:, 1]
+
+        # Sort particles by cell so every cell is a contiguous slice of `order`
+        order = np.argsort(cell_ids).astype(itype)
+        counts = np.bincount(cell_ids, minlength=gx * gy).astype(itype)
+        starts = np.cumsum(counts, dtype=itype) - counts
+        rank = np.empty_like(order)
+        rank[order] = np.arange(n, dtype=itype)
+
+        # Walk the particles in cell order so lookups into the per-cell arrays are sequential
+        sorted_x = np.take(cells_xy[:, 0], order)
+        sorted_y = np.take(cells_xy[:, 1], order)
+        i_parts = []
+        j_parts = []
+        offsets = HALF_NEIGHBOURS[:1] if gx * gy == 1 else HALF_NEIGHBOURS
+        for dx, dy in offsets:
+            nx = sorted_x + dx
+            ny = sorted_y + dy
+            if self.periodic:
+                nx %= gx
+                ny %= gy
+                src = order
+            else:
+                valid = (nx >= 0) & (nx < gx) & (ny >= 0) & (ny < gy)
+                src = order[valid]
+                nx = nx[valid]
+                ny = ny[valid]
+            neighbour = nx * gy + ny
+            i_idx, j_idx = _expand(src, np.take(starts, neighbour), np.take(counts, neighbour), order)
+            if dx == 0 and dy == 0:
+                # Same cell: keep each unordered pair once
+                keep = rank[j_idx] > rank[i_idx]
+                i_idx = i_idx[keep]
+                j_idx = j_idx[keep]
+            i_parts.append(i_idx)
+            j_parts.append(j_idx)
+        return np.concatenate(i_parts), np.concatenate(j_parts)
+
+
+def _expand(src, starts, counts, order):
+    """Pair every particle in `src` with every member of its target cell."""
+    total = int(counts.sum(dtype=np.int64))
+    if total == 0:
+        empty = np.empty(0, dtype=order.dtype)
+        return empty, empty
+    i_idx = np.repeat(src, counts)
+    itype = index_dtype(total)
+    offsets = np.arange(total, dtype=itype) - np.repeat(np.cumsum(counts, dtype=itype) - counts, counts)
+    j_idx = np.take(order, np.repeat(starts, counts) + offsets)
+    return i_idx, j_idx
+
+
+class CollisionEngine:
+    """Vectorized detection and elastic resolution of particle-particle collisions.
+
+    With `periodic`, pair separations use the minimum image across the box edges.
+    """
+
+    def __init__(self, box_size, rng=None, periodic=False, min_cell_size=None):
+        self.box_size = box_size
+        self.rng = np.random if rng is None else rng
+        self.periodic = periodic
+        self.cells = CellList(box_size, periodic, min_cell_size)
+        self.pair_checks = 0
+        self.collisions = 0
+        self.virial = 0.0  # Sum of r_ij . J_ij over the last resolved pairs, for the virial pressure
+
+    def candidate_pairs(self, store, margin=0.0):
+        if len(store) < 2:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        self.cells.resize(2 * store.radii.max() + margin, len(store))
+        return self.cells.candidate_pairs(store.positions)
+
+    def find_pairs(self, store):
+        return self.candidate_pairs(store)
+
+    def separation(self, positions, i_idx, j_idx):
+        # take() gathers rows several times faster than fancy indexing
+        delta_pos = np.take(positions, i_idx, axis=0) - np.take(positions, j_idx, axis=0)
+        if self.periodic:
+            delta_pos -= self.box_size * np.rint(delta_pos / self.box_size)
+        return delta_pos
+
+    def state(self):
+        return {}
+
+    def load_state(self, state):
+        pass
+
+    def resolve(self, store):
+        """Resolve all overlapping pairs in `store` and return the number of collisions."""
+        i_idx, j_idx = self.find_pairs(store)
+        return self.resolve_pairs(store, i_idx, j_idx)
+
+    def resolve_pairs(self, store, i_idx, j_idx):
+        updates = self.pair_updates(store, i_idx, j_idx)
+        if updates is not None:
+            apply_pair_updates(store.positions, store.velocities, updates)
+        return self.collisions
+
+    def pair_updates(self, store, i_idx, j_idx):
+        """New positions and velocities of every particle in a colliding pair, from the current state.
+
+        Colliding pairs are resolved as the original one-at-a-time loop did: in candidate
+        order, each from the state left by the earlier ones, so kinetic energy is conserved
+        when a particle touches several others. Pairs that share no particle do not affect
+        each other, so they are handled in rounds in which no particle appears twice. Nothing
+        is written to `store` (see parallel.py). Returns None if no pair collides, otherwise
+        (index, positions, velocities) for the particles involved.
+        """
+        self.pair_checks = len(i_idx)
+        delta_pos = self.separation(store.positions, i_idx, j_idx)
+        dist_sq = np.einsum('ij,ij->i', delta_pos, delta_pos)
+        min_dist = store.radii[i_idx] + store.radii[j_idx]
+        hit = dist_sq <= min_dist ** 2
+        self.collisions = int(np.count_nonzero(hit))
+        self.virial = 0.0
+        if not self.collisions:
+            return None
+
+        # Work on copies of just the particles involved, indexed locally
+        index, local = np.unique(np.concatenate((i_idx[hit], j_idx[hit])), return_inverse=True)
+        i_local, j_local = local.reshape(2, -1)
+        positions = store.positions[index]
+        velocities = store.velocities[index]
+        masses = store.masses[index]
+        radii = store.radii[index]
+
+        pending = np.arange(len(i_local))
+        while len(pending):
+            # A pair is ready once no earlier pending pair shares one of its particles
+            first = np.full(len(index), len(i_local))
+            np.minimum.at(first, i_local[pending], pending)
+            np.minimum.at(first, j_local[pending], pending)
+            ready = (first[i_local[pending]] == pending) & (first[j_local[pending]] == pending)
+            self._resolve_round(positions, velocities, masses, radii, i_local[pending[ready]], j_local[pending[ready]])
+            pending = pending[~ready]
+        return index, positions, velocities
+
+    def _resolve_round(self, positions, velocities, masses, radii, i_idx, j_idx):
+        """Resolve pairs that share no particle, in place."""
+        delta_pos = self.separation(positions, i_idx, j_idx)
+        dist_sq = np.einsum('ij,ij->i', delta_pos, delta_pos)
+        min_dist = radii[i_idx] + radii[j_idx]
+        # An earlier pair may already have pushed this one apart
+        hit = dist_sq <= min_dist ** 2
+        if not hit.all():
+            i_idx, j_idx, delta_pos, min_dist, dist_sq = (
+                i_idx[hit], j_idx[hit], delta_pos[hit], min_dist[hit], dist_sq[hit])
+        distance = np.sqrt(dist_sq)
+
+        # Prevent division by zero for coincident particles
+        coincident = distance == 0
+        if coincident.any():
+            angle = self.rng.uniform(0, 2 * np.pi, size=int(coincident.sum()))
+            delta_pos[coincident] = min_dist[coincident, None] * np.column_stack((np.cos(angle), np.sin(angle)))
+            distance[coincident] = min_dist[coincident]
+
+        # Push overlapping particles apart
+        overlap = 0.5 * (min_dist - distance)
+        correction = (overlap / distance)[:, None] * delta_pos
+        positions[i_idx] += correction
+        positions[j_idx] -= correction
+
+        # Update velocities of approaching pairs
+        norm_delta_pos = delta_pos / distance[:, None]
+        delta_vel = velocities[i_idx] - velocities[j_idx]
+        rel_vel = np.einsum('ij,ij->i', delta_vel, norm_delta_pos)
+        approaching = rel_vel < 0
+        if approaching.any():
+            i_idx = i_idx[approaching]
+            j_idx = j_idx[approaching]
+            norm_delta_pos = norm_delta_pos[approaching]
+            m1 = masses[i_idx]
+            m2 = masses[j_idx]
+            impulse = (2 * rel_vel[approaching]) / (1 / m1 + 1 / m2)
+            # Impulses act at contact distance along the line of centres
+            self.virial -= float(np.dot(impulse.astype(np.float64, copy=False),
+                                        min_dist[approaching].astype(np.float64, copy=False)))
+            velocities[i_idx] -= (impulse / m1)[:, None] * norm_delta_pos
+            velocities[j_idx] += (impulse / m2)[:, None] * norm_delta_pos
+
+
+def apply_pair_updates(positions, velocities, updates):
+    """Write the result of CollisionEngine.pair_updates into position and velocity arrays."""
+    index, new_positions, new_velocities = updates
+    positions[index] = new_positions
+    velocities[index] = new_velocities
+
+
+class NeighborListEngine(CollisionEngine):
+    """Collision engine that reuses a Verlet list of pairs within 2*radius + skin."""
+
+    def __init__(self, box_size, skin, rng=None, periodic=False, min_cell_size=None):
+        super().__init__(box_size, rng, periodic, min_cell_size)
+        self.skin = skin
+        self.pairs = None
+        self.reference_positions = None
+        # Counters for tuning the skin
+        self.steps = 0
+        self.rebuilds = 0
+        self.rebuilt = False
+        self.pair_count = 0
+
+    @property
+    def rebuild_rate(self):
+        return self.rebuilds / self.steps if self.steps else 0.0
+
+    def needs_rebuild(self, store):
+        if self.pairs is None or len(self.reference_positions) != len(store):
+            return True
+        displacement = store.positions - self.reference_positions
+        if self.periodic:
+            displacement -= self.box_size * np.rint(displacement / self.box_size)
+        max_disp_sq = np.einsum('ij,ij->i', displacement, displacement).max(initial=0.0)
+        return max_disp_sq > (0.5 * self.skin) ** 2
+
+    def rebuild(self, store):
+        i_idx, j_idx = self.candidate_pairs(store, self.skin)
+        delta_pos = self.separation(store.positions, i_idx, j_idx)
+        dist_sq = np.einsum('ij,ij->i', delta_pos, delta_pos)
+        cutoff = store.radii[i_idx] + store.radii[j_idx] + self.skin
+        keep = dist_sq <= cutoff ** 2
+        self.pairs = (i_idx[keep], j_idx[keep])
+        self.reference_positions = store.positions.copy()
+        self.rebuilds += 1
+
+    def find_pairs(self, store):
+        self.steps += 1
+        self.rebuilt = self.needs_rebuild(store)
+        if self.rebuilt:
+            self.rebuild(store)
+        self.pair_count = len(self.pairs[0])
+        return self.pairs
+
+    def invalidate(self):
+        self.pairs = None
+
+    def state(self):
+        state = {'counters': np.array([self.steps, self.rebuilds, self.pair_count])}
+        if self.pairs is not None:
+            state.update(pairs_i=self.pairs[0], pairs_j=self.pairs[1], reference_positions=self.reference_positions)
+        return state
+
+    def load_state(self, state):
+        self.steps, self.rebuilds, self.pair_count = (int(v) for v in state['counters'])
+        if 'pairs_i' in state:
+            self.pairs = (state['pairs_i'], state['pairs_j'])
+            self.reference_positions = state['reference_positions'].copy()
+        else:
+            self.invalidate()
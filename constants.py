@@ -7,8 +7,18 @@ DARK_GRAY = (50, 50, 50)
 RED = (255, 0, 0)
 GREEN = (0, 255, 0)
 screen_width,screen_height = 800,600
+# Idle screens sleep in pygame.event.wait for at most this long (ms) between checks
+IDLE_TIMEOUT = 250
 # Fonts (these can be initialized in main.py or reused)
-import pygame
-pygame.init()
-font = pygame.font.SysFont('Arial', 18)
-big_font = pygame.font.SysFont('Arial', 24)
+
+_FONT_SIZES = {'font': 18, 'big_font': 24}
+
+
+def __getattr__(name):
+    # Fonts are created on first use so headless simulations never initialise pygame
+    if name in _FONT_SIZES:
+        from utils import get_font
+        value = get_font('Arial', _FONT_SIZES[name])
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
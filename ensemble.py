@@ -0,0 +1,71 @@
+# ensemble.py
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+import numpy as np
+
+
+def run_replica(params, seed):
+    """Run one headless simulation and return its time, temperature and pressure series."""
+    from simulation import Simulation
+    simulation = Simulation(**params, headless=True, seed=seed)
+    simulation.run()
+    return np.asarray(simulation.times), np.asarray(simulation.temperatures), np.asarray(simulation.pressures)
+
+
+class EnsembleResult:
+    """Per-replica series plus their mean and confidence band at every time point."""
+
+    def __init__(self, times, temperatures, pressures, confidence):
+        self.times = times
+        self.temperatures = temperatures  # shape (replicas, steps)
+        self.pressures = pressures
+        self.confidence = confidence
+        self.temperature_mean, self.temperature_low, self.temperature_high = confidence_band(temperatures, confidence)
+        self.pressure_mean, self.pressure_low, self.pressure_high = confidence_band(pressures, confidence)
+
+    def save(self, path):
+        np.savez(path, times=self.times, temperatures=self.temperatures, pressures=self.pressures,
+                 temperature_mean=self.temperature_mean, temperature_low=self.temperature_low,
+                 temperature_high=self.temperature_high, pressure_mean=self.pressure_mean,
+                 pressure_low=self.pressure_low, pressure_high=self.pressure_high)
+
+
+def confidence_band(samples, confidence=0.95):
+    """Mean over replicas (axis 0) with a normal-approximation confidence interval."""
+    mean = samples.mean(axis=0)
+    if len(samples) < 2:
+        return mean, mean.copy(), mean.copy()
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    half_width = z * samples.std(axis=0, ddof=1) / np.sqrt(len(samples))
+    return mean, mean - half_width, mean + half_width
+
+
+def run_ensemble(params, replicas, seed=None, max_workers=None, confidence=0.95, on_replica=None):
+    """Run `replicas` independent copies of a simulation across a process pool.
+
+    `params` holds the Simulation arguments (num_particles, box_size, particle_radius,
+    temperature, dt, total_steps and any keyword options). Every replica gets its own
+    child of one SeedSequence, so a given `seed` reproduces the whole ensemble no
+    matter how the replicas are scheduled. `on_replica(index, temperatures, pressures)`
+    is called as each replica finishes. With `history` or `decimate` in `params` each
+    replica returns fewer rows than total_steps; all of them return the same number.
+    """
+    # Replicas are compared step by step, so none of them may stop early on convergence
+    params = dict(params, pressure_tolerance=None)
+    times = temperatures = pressures = None
+    seeds = np.random.SeedSequence(seed).spawn(replicas)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_replica, params, seeds[k]): k for k in range(replicas)}
+        for future in as_completed(futures):
+            k = futures[future]
+            series = future.result()
+            if times is None:
+                # Sized from the first replica to finish
+                times, temperatures, pressures = (np.empty((replicas, len(values))) for values in series)
+            times[k], temperatures[k], pressures[k] = series
+            if on_replica is not None:
+                on_replica(k, temperatures[k], pressures[k])
+
+    # Replicas share a time axis unless steps are adaptive; then step k is at their mean time
+    return EnsembleResult(times.mean(axis=0), temperatures, pressures, confidence)
@@ -0,0 +1,295 @@
+# events.py
+import heapq
+import numpy as np
+from collisions import CellList
+
+# Partner codes for wall and cell-crossing events (particle partners are non-negative indices)
+X_WALL = -1
+Y_WALL = -2
+X_CELL = -3
+Y_CELL = -4
+
+
+class EventDrivenEngine:
+    """Exact hard-disk dynamics driven by a priority queue of predicted collisions.
+
+    Each particle keeps its own time stamp and is only advanced when it takes part
+    in an event, so time jumps straight from one collision to the next. Every
+    particle has one live prediction in the queue; predictions are invalidated
+    lazily by comparing per-particle collision counters when they are popped.
+
+    Partners are only searched in the 3x3 block of cells around a particle. Cells are
+    at least one interaction range wide, and crossing into the next cell is itself an
+    event that re-predicts the particle against its new neighbours, so no collision is
+    missed and each event costs O(1) instead of O(N).
+
+    This mode is for exactness first: no collision is missed or resolved late,
+    whatever the speeds. Each event costs far more than one particle's share of a
+    fixed-dt step, so it only runs faster than stepping when events are rare, i.e.
+    at very low density (about 0.5% packing and below for a few hundred particles).
+    """
+
+    def __init__(self, store, box_size, min_cell_size=None):
+        self.store = store
+        self.box_size = box_size
+        self.time = 0.0
+        self.events_processed = 0
+        self.crossings = 0  # Cell crossings processed, not counted as events
+        self.virial = 0.0
+        self.queue = []
+        self._seq = 0
+        self.cells = CellList(box_size, min_cell_size=min_cell_size)
+        self.reset()
+
+    def reset(self):
+        """Forget every prediction and re-predict from the current particle state."""
+        store = self.store
+        n = len(store)
+        self.last_update = np.full(n, self.time)
+        self.counts = np.zeros(n, dtype=np.int64)
+        self.assign_cells()
+        everyone = np.arange(n)
+        best_dt, partner = self.boundary_times(everyone, store.positions)
+
+        # All particle pairs in neighbouring cells at once, each a candidate for both sides
+        if n > 1:
+            i_idx, j_idx = self.cells.candidate_pairs(store.positions)
+            sigma = store.radii[i_idx] + store.radii[j_idx]
+            times = pair_times(store.positions[i_idx] - store.positions[j_idx],
+                               store.velocities[i_idx] - store.velocities[j_idx], sigma)
+            hit = np.isfinite(times)
+            first = np.concatenate((i_idx[hit], j_idx[hit]))
+            second = np.concatenate((j_idx[hit], i_idx[hit]))
+            times = np.concatenate((times[hit], times[hit]))
+            order = np.lexsort((times, first))
+            particles, leading = np.unique(first[order], return_index=True)
+            earliest = order[leading]
+            sooner = times[earliest] < best_dt[particles]
+            best_dt[particles[sooner]] = times[earliest[sooner]]
+            partner[particles[sooner]] = second[earliest[sooner]]
+
+        self.queue = []
+        for i in np.flatnonzero(np.isfinite(best_dt)):
+            self._seq += 1
+            self.queue.append((self.time + max(float(best_dt[i]), 0.0), self._seq, int(i), int(partner[i]), 0, 0))
+        heapq.heapify(self.queue)
+
+    def assign_cells(self, cells_xy=None):
+        """Bin every particle into a cell, or take the given (n, 2) cell coordinates."""
+        store = self.store
+        self.cells.resize(max(2 * float(store.radii.max()) if len(store) else 0.0, self.cell_spacing()), len(store))
+        self.cell_size = self.cells.cell_size.tolist()
+        gx, gy = self.cells.grid_shape
+        if cells_xy is None:
+            cells_xy = np.floor(store.positions / self.cells.cell_size).astype(np.int64)
+            np.clip(cells_xy[:, 0], 0, gx - 1, out=cells_xy[:, 0])
+            np.clip(cells_xy[:, 1], 0, gy - 1, out=cells_xy[:, 1])
+        self.cell = np.array(cells_xy, dtype=np.int64).reshape(-1, 2)
+        self.members = [set() for _ in range(gx * gy)]
+        for i, cell_id in enumerate(self.cell[:, 0] * gy + self.cell[:, 1]):
+            self.members[cell_id].add(i)
+
+    def cell_spacing(self):
+        """Cell width of about one mean free path, holding between 4 and 64 particles per cell.
+
+        Crossings cost as much as collisions, so cells much narrower than the mean free
+        path mostly add crossing events, while wide cells make every prediction scan
+        more neighbours. 2D hard discs travel 1 / (2 sqrt(2) n d) between collisions.
+        """
+        store = self.store
+        n = max(len(store), 1)
+        diameter = 2 * float(store.radii.mean()) if len(store) else 1.0
+        mean_free_path = self.box_size ** 2 / (2 * np.sqrt(2) * n * diameter)
+        spacing = self.box_size / np.sqrt(n)
+        return float(np.clip(mean_free_path, 2 * spacing, 8 * spacing))
+
+    def neighbours(self, i):
+        """Particles in the 3x3 block of cells around particle i, excluding i."""
+        gx, gy = self.cells.grid_shape
+        cx, cy = self.cell[i]
+        found = []
+        for x in range(max(cx - 1, 0), min(cx + 2, gx)):
+            for y in range(max(cy - 1, 0), min(cy + 2, gy)):
+                found.extend(self.members[x * gy + y])
+        found.remove(i)
+        return np.array(found, dtype=np.int64)
+
+    def boundary_times(self, idx, positions):
+        """Earliest wall or cell-crossing time of the particles idx at `positions`, with partner codes."""
+        store = self.store
+        velocities = store.velocities[idx]
+        radii = store.radii[idx]
+        best_dt = np.full(len(idx), np.inf)
+        partner = np.zeros(len(idx), dtype=np.int64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            for axis, wall, crossing in ((0, X_WALL, X_CELL), (1, Y_WALL, Y_CELL)):
+                v = velocities[:, axis]
+                x = positions[:, axis]
+                for limit, code in ((np.where(v > 0, self.box_size - radii, radii), wall),
+                                    (self.cell_edges(idx, axis, v), crossing)):
+                    dt = np.where(v != 0, (limit - x) / v, np.inf)
+                    dt[np.isnan(dt)] = np.inf
+                    sooner = dt < best_dt
+                    best_dt[sooner] = dt[sooner]
+                    partner[sooner] = code
+        return best_dt, partner
+
+    def cell_edges(self, idx, axis, v):
+        # The cell boundary each particle is heading for; NaN at the outer walls
+        cell = self.cell[idx, axis]
+        width = self.cells.cell_size[axis]
+        last = self.cells.grid_shape[axis] - 1
+        edge = np.where(v > 0, (cell + 1) * width, cell * width)
+        edge[((v > 0) & (cell == last)) | ((v < 0) & (cell == 0))] = np.nan
+        return edge
+
+    def state(self):
+        queue = np.array([event[1:] for event in self.queue], dtype=np.int64).reshape(-1, 5)
+        return {
+            'time': np.array([self.time]),
+            'counters': np.array([self.events_processed, self._seq]),
+            'last_update': self.last_update,
+            'counts': self.counts,
+            'cells': self.cell,
+            'queue_times': np.array([event[0] for event in self.queue]),
+            'queue': queue,
+        }
+
+    def load_state(self, state):
+        self.time = float(state['time'][0])
+        self.events_processed, self._seq = (int(v) for v in state['counters'])
+        self.last_update = state['last_update'].copy()
+        self.counts = state['counts'].copy()
+        self.assign_cells(state.get('cells'))
+        # The saved list is already a valid heap, so it is restored as is
+        self.queue = [(float(t), *(int(v) for v in row)) for t, row in zip(state['queue_times'], state['queue'])]
+
+    def predict(self, i):
+        """Push the earliest wall, cell-crossing or particle collision of particle i."""
+        store = self.store
+        t = self.time
+        elapsed = t - float(self.last_update[i])
+        vel = store.velocities[i].tolist()
+        pos = [p + v * elapsed for p, v in zip(store.positions[i].tolist(), vel)]
+        radius = float(store.radii[i])
+        cell = self.cell[i].tolist()
+        cell_size = self.cell_size
+        grid_shape = self.cells.grid_shape
+
+        best_dt = np.inf
+        partner = None
+        for axis, wall, crossing in ((0, X_WALL, X_CELL), (1, Y_WALL, Y_CELL)):
+            if vel[axis] > 0:
+                dt = (self.box_size - radius - pos[axis]) / vel[axis]
+                edge = (cell[axis] + 1) * cell_size[axis] if cell[axis] < grid_shape[axis] - 1 else None
+            elif vel[axis] < 0:
+                dt = (radius - pos[axis]) / vel[axis]
+                edge = cell[axis] * cell_size[axis] if cell[axis] > 0 else None
+            else:
+                continue
+            if dt < best_dt:
+                best_dt = dt
+                partner = wall
+            if edge is not None:
+                dt = (edge - pos[axis]) / vel[axis]
+                if dt < best_dt:
+                    best_dt = dt
+                    partner = crossing
+
+        others = self.neighbours(i)
+        if len(others):
+            positions = store.positions[others] + store.velocities[others] * (t - self.last_update[others])[:, None]
+            times = pair_times(np.subtract(pos, positions), np.subtract(vel, store.velocities[others]),
+                               radius + store.radii[others])
+            k = int(np.argmin(times))
+            if times[k] < best_dt:
+                best_dt = float(times[k])
+                partner = int(others[k])
+
+        if partner is None:
+            return
+        partner_count = self.counts[partner] if partner >= 0 else 0
+        self._seq += 1
+        heapq.heappush(self.queue, (t + max(best_dt, 0.0), self._seq, i, partner,
+                                    self.counts[i], partner_count))
+
+    def _advance_particle(self, i, t):
+        self.store.positions[i] += self.store.velocities[i] * (t - self.last_update[i])
+        self.last_update[i] = t
+
+    def synchronize(self, t):
+        """Bring every particle to time t so the store can be drawn or sampled."""
+        self.store.positions += self.store.velocities * (t - self.last_update)[:, None]
+        self.last_update[:] = t
+        self.time = t
+
+    def advance(self, interval):
+        """Process all events in the next `interval` of time and return the wall impulse."""
+        store = self.store
+        t_end = self.time + interval
+        wall_impulse = 0.0
+        self.virial = 0.0  # Sum of r_ij . J_ij over pair collisions in this interval
+        while self.queue and self.queue[0][0] <= t_end:
+            t, _, i, partner, count_i, count_partner = heapq.heappop(self.queue)
+            if self.counts[i] != count_i:
+                continue  # Particle i was already re-predicted
+            self.time = t
+            if partner >= 0 and self.counts[partner] != count_partner:
+                # The partner changed course, so i needs a fresh prediction
+                self.predict(i)
+                continue
+
+            self._advance_particle(i, t)
+            if partner <= X_CELL:
+                # Crossing into the next cell changes nothing but the neighbours to check
+                axis = X_CELL - partner
+                cell = self.cell[i]
+                gy = self.cells.grid_shape[1]
+                self.members[cell[0] * gy + cell[1]].remove(i)
+                cell[axis] += 1 if store.velocities[i, axis] > 0 else -1
+                self.members[cell[0] * gy + cell[1]].add(i)
+                self.crossings += 1
+                self.predict(i)
+                continue
+            if partner < 0:
+                axis = -1 - partner
+                store.velocities[i, axis] = -store.velocities[i, axis]
+                low = store.velocities[i, axis] > 0
+                store.positions[i, axis] = store.radii[i] if low else self.box_size - store.radii[i]
+                wall_impulse += 2 * abs(store.masses[i] * store.velocities[i, axis])
+                self.counts[i] += 1
+                self.predict(i)
+            else:
+                j = partner
+                self._advance_particle(j, t)
+                delta_pos = store.positions[i] - store.positions[j]
+                distance = np.sqrt(np.dot(delta_pos, delta_pos))
+                norm_delta_pos = delta_pos / distance
+                rel_vel = np.dot(store.velocities[i] - store.velocities[j], norm_delta_pos)
+                if rel_vel < 0:
+                    m1 = store.masses[i]
+                    m2 = store.masses[j]
+                    impulse = (2 * rel_vel) / (1 / m1 + 1 / m2)
+                    self.virial -= impulse * distance
+                    store.velocities[i] -= (impulse / m1) * norm_delta_pos
+                    store.velocities[j] += (impulse / m2) * norm_delta_pos
+                self.counts[i] += 1
+                self.counts[j] += 1
+                self.predict(i)
+                self.predict(j)
+            self.events_processed += 1
+
+        self.synchronize(t_end)
+        return wall_impulse
+
+
+def pair_times(dr, dv, sigma):
+    """Time until discs with separations dr, relative velocities dv and contact distances sigma touch; inf if never."""
+    b = np.einsum('ij,ij->i', dr, dv)
+    dvv = np.einsum('ij,ij->i', dv, dv)
+    drr = np.einsum('ij,ij->i', dr, dr)
+    disc = b * b - dvv * (drr - sigma ** 2)
+    ok = (b < 0) & (disc > 0)
+    times = np.full(len(b), np.inf)
+    times[ok] = -(b[ok] + np.sqrt(disc[ok])) / dvv[ok]
+    return times
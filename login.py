@@ -54,8 +54,12 @@ def add_sample_users():
     conn.commit()
     conn.close()
 
-def login():
-    """Handle the login GUI and return login status and username."""
+def login(options=None):
+    """Handle the login GUI and return login status and username.
+
+    `options` holds extra Simulation keyword arguments (display settings from the
+    command line) for the run started from the menu.
+    """
 
     def attempt_login():
         nonlocal login_successful, username
@@ -74,9 +78,9 @@ def login():
             login_successful = True
             root.withdraw()  # Hide the login window on successful login
             if username == 'admin':
-                open_admin_page(root, username)
+                open_admin_page(root, username, options)
             else:
-                open_main_app(root, username)
+                open_main_app(root, username, options)
         else:
             error_label.config(text="Invalid username or password.")
 
@@ -166,7 +170,7 @@ def login():
 
     root.mainloop()
 
-def open_admin_page(root, username):
+def open_admin_page(root, username, options=None):
     """Open the admin page window."""
     admin_window = tk.Toplevel(root)
     admin_window.title("Admin Page")
@@ -204,7 +208,7 @@ def open_admin_page(root, username):
     main_app_button = ttk.Button(
         main_frame,
         text="Go to Main App",
-        command=lambda: open_main_app(admin_window, username),
+        command=lambda: open_main_app(admin_window, username, options),
         width=button_width
     )
     main_app_button.pack(pady=10)
@@ -456,7 +460,7 @@ def add_user():
     save_button = ttk.Button(main_frame, text="Save", command=save_user)
     save_button.pack(pady=20, fill='x')
 
-def open_main_app(window, username):
+def open_main_app(window, username, options=None):
     """Function to open the main application."""
     from menu import menu  # Assuming 'menu.py' is in the same directory
 
@@ -473,7 +477,8 @@ def open_main_app(window, username):
         num_particles, box_size, particle_radius, temperature, dt, total_steps = params
         # Initialize and run your simulation with these parameters
         from simulation import Simulation  # Import your simulation class
-        simulation = Simulation(num_particles, box_size, particle_radius, temperature, dt, total_steps)
+        simulation = Simulation(num_particles, box_size, particle_radius, temperature, dt, total_steps,
+                                **(options or {}))
         simulation.run()
 
     pygame.quit()
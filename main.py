@@ -1,10 +1,174 @@
 # main.py
 
-from login import login
+import argparse
 
-def main():
+
+def parse_args(argv=None):
+    """Parse command-line options for headless batch runs."""
+    parser = argparse.ArgumentParser(description='Ideal Gas Simulation')
+    parser.add_argument('--headless', action='store_true',
+                        help='run the simulation without a window or login and write the results to disk')
+    # Same parameters and defaults as the menu screen
+    parser.add_argument('--num-particles', type=int, default=50)
+    parser.add_argument('--box-size', type=int, default=600)
+    parser.add_argument('--particle-radius', type=int, default=5)
+    parser.add_argument('--temperature', type=float, default=1.0)
+    parser.add_argument('--dt', type=float, default=0.5)
+    parser.add_argument('--total-steps', type=int, default=2000)
+    parser.add_argument('--engine', choices=('steps', 'events'), default='steps')
+    parser.add_argument('--neighbor-skin', type=float, default=None)
+    parser.add_argument('--adaptive-dt', type=float, default=None, metavar='FRACTION',
+                        help='shorten steps so no particle moves more than FRACTION of its radius; --dt is the maximum')
+    parser.add_argument('--boundary', choices=('walls', 'periodic'), default='walls')
+    parser.add_argument('--precision', choices=('float64', 'float32'), default='float64',
+                        help='floating-point type of the particle state; float32 halves its memory traffic')
+    parser.add_argument('--slab-workers', type=int, default=None,
+                        help='split the box into this many slabs, each stepped by its own process')
+    parser.add_argument('--cell-size', type=float, default=None,
+                        help='minimum collision cell width (default: one interaction range)')
+    parser.add_argument('--pressure', choices=('wall', 'window', 'virial'), default=None,
+                        help='pressure estimator: per-step wall impulse (default with walls), wall impulse '
+                             'over a sliding window, or pair virial (default and required when periodic)')
+    parser.add_argument('--pressure-window', type=int, default=100)
+    parser.add_argument('--tolerance', type=float, default=None,
+                        help='stop once the relative standard error of the mean pressure is below TOLERANCE')
+    parser.add_argument('--history', type=int, default=None,
+                        help='keep only the last HISTORY samples in memory')
+    parser.add_argument('--decimate', type=int, default=1, help='store every DECIMATE-th sample')
+    parser.add_argument('--spill', default=None, help='append the full decimated series to this raw file (times go to SPILL.time)')
+    parser.add_argument('--record', default=None, help='record the trajectory to this file')
+    parser.add_argument('--record-every', type=int, default=1)
+    parser.add_argument('--replay', default=None, metavar='TRAJECTORY',
+                        help='open a recorded trajectory in the replay viewer')
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file for periodic and interrupt saves')
+    parser.add_argument('--checkpoint-every', type=int, default=None)
+    parser.add_argument('--resume', default=None, metavar='CHECKPOINT',
+                        help='continue a headless run from a checkpoint with its saved parameters')
+    parser.add_argument('--profile', default=None, metavar='JSON',
+                        help='time each phase of the step loop and write rolling percentiles to this file')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--replicas', type=int, default=1,
+                        help='run an ensemble of independent replicas across a process pool')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--sweep', action='append', default=[], metavar='NAME=V1,V2,...',
+                        help='sweep a parameter over several values (repeatable), e.g. --sweep temperature=0.5,1,2')
+    parser.add_argument('--output', default='results.csv',
+                        help='where to write the temperature/pressure series (.csv or .npz)')
+    # Display options for the windowed run started from the menu
+    parser.add_argument('--substeps', type=substeps_arg, default=1,
+                        help="physics steps per rendered frame, or 'auto' for as many as fit in a frame")
+    parser.add_argument('--fps', type=int, default=60, help='rendered frames per second')
+    parser.add_argument('--live-plots', action='store_true',
+                        help='draw temperature and pressure charts next to the box while the run is going')
+    parser.add_argument('--background', action='store_true',
+                        help='step the physics in a separate process so rendering never holds it up')
+    return parser.parse_args(argv)
+
+
+def substeps_arg(value):
+    return value if value == 'auto' else int(value)
+
+
+def window_options(args):
+    """Simulation options that only apply when the run has a window."""
+    return {'substeps': args.substeps, 'fps': args.fps, 'live_plots': args.live_plots,
+            'background': args.background}
+
+
+def simulation_params(args):
+    """Simulation arguments shared by single runs and ensembles."""
+    return {
+        'num_particles': args.num_particles,
+        'box_size': args.box_size,
+        'particle_radius': args.particle_radius,
+        'temperature': args.temperature,
+        'dt': args.dt,
+        'total_steps': args.total_steps,
+        'neighbor_skin': args.neighbor_skin,
+        'engine': args.engine,
+        'adaptive_dt': args.adaptive_dt,
+        'pressure_estimator': args.pressure,
+        'pressure_window': args.pressure_window,
+        'pressure_tolerance': args.tolerance,
+        'boundary': args.boundary,
+        'cell_size': args.cell_size,
+        'precision': args.precision,
+    }
+
+
+def run_headless(args):
+    """Run a single simulation without pygame display or the Tk login."""
+    from simulation import Simulation
+    options = {'headless': True, 'output_path': args.output, 'spill_path': args.spill,
+               'record_path': args.record, 'record_every': args.record_every,
+               'checkpoint_path': args.checkpoint, 'checkpoint_every': args.checkpoint_every,
+               'profile': bool(args.profile), 'profile_path': args.profile, 'slab_workers': args.slab_workers}
+    if args.resume:
+        simulation = Simulation.from_checkpoint(args.resume, **options)
+    else:
+        simulation = Simulation(**simulation_params(args), seed=args.seed, history=args.history,
+                                decimate=args.decimate, **options)
+    simulation.run()
+    pressure_error = simulation.stats.blocks.standard_error[1]
+    converged = ' (converged)' if simulation.step_count < simulation.total_steps else ''
+    print(f"Wrote {simulation.step_count} steps to {args.output}; "
+          f"mean pressure {simulation.stats.running.mean[1]:.5g} +/- {pressure_error:.2g}{converged}")
+
+
+def run_ensemble(args):
+    """Run independent replicas in parallel and save their mean and confidence bands."""
+    from ensemble import run_ensemble
+    params = dict(simulation_params(args), history=args.history, decimate=args.decimate)
+    result = run_ensemble(params, args.replicas, seed=args.seed, max_workers=args.workers)
+    result.save(args.output)
+    print(f"Wrote {args.replicas} replicas of {args.total_steps} steps to {args.output}")
+
+
+def parse_sweep(specs):
+    """Turn ['temperature=0.5,1'] into {'temperature': [0.5, 1.0]}, typed like the CLI options."""
+    types = {'num_particles': int, 'box_size': int, 'particle_radius': int,
+             'temperature': float, 'dt': float, 'total_steps': int}
+    axes = {}
+    for spec in specs:
+        name, _, values = spec.partition('=')
+        name = name.replace('-', '_')
+        if name not in types:
+            raise SystemExit(f"Cannot sweep over {name!r}; choose from {', '.join(types)}")
+        axes[name] = [types[name](value) for value in values.split(',')]
+    return axes
+
+
+def run_sweep(args):
+    """Run an equation-of-state sweep, reusing cached points, and write the PV vs NkT table."""
+    from sweep import run_sweep, write_table
+    seed = args.seed if args.seed is not None else 0
+    table, computed = run_sweep(simulation_params(args), parse_sweep(args.sweep), seed=seed,
+                                max_workers=args.workers)
+    for row in table:
+        print(f"N={row['num_particles']:>6} L={row['box_size']:>5} T0={row['temperature']:<6g} "
+              f"PV={row['PV']:<10.4g} NkT={row['NkT']:<10.4g} PV/NkT={row['ratio']:.3f}")
+    write_table(table, args.output)
+    print(f"Computed {computed} of {len(table)} points; wrote {args.output}")
+
+
+def main(argv=None):
     """Main function to start the application."""
-    login()  # Start the login process
+    args = parse_args(argv)
+    if args.replay:
+        from trajectory import replay
+        replay(args.replay)
+        return
+    if args.sweep:
+        run_sweep(args)
+        return
+    if args.headless:
+        if args.replicas > 1:
+            run_ensemble(args)
+        else:
+            run_headless(args)
+        return
+    from login import login
+    login(window_options(args))  # Start the login process
 
 if __name__ == "__main__":
     main()
@@ -1,18 +1,18 @@
 import pygame
 import sys
-from utils import draw_text
-from constants import BLACK, WHITE, GRAY, DARK_GRAY, BLUE, screen_width, screen_height
+from utils import draw_text, get_font, render_text
+from constants import BLACK, WHITE, GRAY, DARK_GRAY, BLUE, IDLE_TIMEOUT, screen_width, screen_height
 from quiz import quiz_ui
 
+
 def menu(screen, username):
     pygame.init()
-    clock = pygame.time.Clock()
 
     # Load fonts
-    title_font = pygame.font.SysFont('Arial', 36, bold=True)
-    label_font = pygame.font.SysFont('Arial', 24)
-    input_font = pygame.font.SysFont('Arial', 22)
-    button_font = pygame.font.SysFont('Arial', 24)
+    title_font = get_font('Arial', 36, bold=True)
+    label_font = get_font('Arial', 24)
+    input_font = get_font('Arial', 22)
+    button_font = get_font('Arial', 24)
 
     # Load background image (optional)
     try:
@@ -45,76 +45,104 @@ def menu(screen, username):
         {'label': 'Total Steps:', 'value': str(total_steps), 'rect': None},
     ]
 
+    # Layout
+    y_offset = 100
+    box_width = 300
+    box_height = 40
+    box_gap = 50
+    for i, box in enumerate(input_boxes):
+        box['rect'] = pygame.Rect(350, y_offset + i * box_gap, box_width, box_height)
+    y_offset += len(input_boxes) * box_gap
+    start_button_rect = pygame.Rect(150, y_offset + 50, 150, 50)
+    quiz_button_rect = pygame.Rect(350, y_offset + 50, 150, 50)
+
+    # Static parts (background, header, footer, labels) are composed once
+    background = pygame.Surface((screen_width, screen_height))
+    if background_image:
+        background.blit(background_image, (0, 0))
+    else:
+        background.fill(BLACK)
+    header_rect = pygame.Rect(0, 0, screen_width, 80)
+    pygame.draw.rect(background, DARK_GRAY, header_rect)
+    draw_text('Ideal Gas Simulation', title_font, TEXT_COLOR, background, screen_width // 2, 40, center=True)
+    footer_rect = pygame.Rect(0, screen_height - 40, screen_width, 40)
+    pygame.draw.rect(background, DARK_GRAY, footer_rect)
+    draw_text(f'Logged in as: {username}', label_font, TEXT_COLOR, background, 10, screen_height - 30)
+    for box in input_boxes:
+        label_surface = render_text(box['label'], label_font, WHITE)
+        background.blit(label_surface, label_surface.get_rect(topleft=(50, box['rect'].y + 10)))
+
+    def draw_input_box(i):
+        rect = input_boxes[i]['rect']
+        screen.blit(background, rect, rect)
+        color = ACTIVE_BOX_COLOR if active_input == i else INPUT_BOX_COLOR
+        pygame.draw.rect(screen, color, rect, border_radius=5)
+        # Text inside input box
+        text_surface = render_text(input_boxes[i]['value'], input_font, BLACK)
+        screen.blit(text_surface, text_surface.get_rect(center=rect.center))
+        return rect
+
+    def draw_button(rect, caption, hovered):
+        screen.blit(background, rect, rect)
+        pygame.draw.rect(screen, BUTTON_HOVER_COLOR if hovered else BUTTON_COLOR, rect, border_radius=10)
+        draw_text(caption, button_font, WHITE, screen, rect.centerx, rect.centery, center=True)
+        return rect
+
+    def draw_all():
+        screen.blit(background, (0, 0))
+        for i in range(len(input_boxes)):
+            draw_input_box(i)
+        draw_button(start_button_rect, 'Start', start_hover)
+        draw_button(quiz_button_rect, 'Quiz', quiz_hover)
+        pygame.display.flip()
+
     active_input = None
+    start_hover = quiz_hover = False
+    full_redraw = True
     run = True
     while run:
-        if background_image:
-            screen.blit(background_image, (0, 0))
-        else:
-            screen.fill(BLACK)
-
-        # Draw header
-        header_rect = pygame.Rect(0, 0, screen_width, 80)
-        pygame.draw.rect(screen, DARK_GRAY, header_rect)
-        draw_text('Ideal Gas Simulation', title_font, TEXT_COLOR, screen, screen_width // 2, 40, center=True)
-
-        # Draw footer with username
-        footer_rect = pygame.Rect(0, screen_height - 40, screen_width, 40)
-        pygame.draw.rect(screen, DARK_GRAY, footer_rect)
-        draw_text(f'Logged in as: {username}', label_font, TEXT_COLOR, screen, 10, screen_height - 30)
-
-        mx, my = pygame.mouse.get_pos()
-
-        # Render input boxes
-        y_offset = 100
-        box_width = 300
-        box_height = 40
-        box_gap = 50
-        input_box_rects = []
-        for i, box in enumerate(input_boxes):
-            # Label
-            label_surface = label_font.render(box['label'], True, WHITE)
-            label_rect = label_surface.get_rect(topleft=(50, y_offset + 10))
-            screen.blit(label_surface, label_rect)
-
-            # Input box
-            rect = pygame.Rect(350, y_offset, box_width, box_height)
-            color = ACTIVE_BOX_COLOR if active_input == i else INPUT_BOX_COLOR
-            pygame.draw.rect(screen, color, rect, border_radius=5)
-            # Text inside input box
-            text_surface = input_font.render(box['value'], True, BLACK)
-            text_rect = text_surface.get_rect(center=rect.center)
-            screen.blit(text_surface, text_rect)
-            box['rect'] = rect
-            y_offset += box_gap
-
-        # Start button
-        start_button_rect = pygame.Rect(150, y_offset + 50, 150, 50)
-        start_button_color = BUTTON_HOVER_COLOR if start_button_rect.collidepoint((mx, my)) else BUTTON_COLOR
-        pygame.draw.rect(screen, start_button_color, start_button_rect, border_radius=10)
-        draw_text('Start', button_font, WHITE, screen, start_button_rect.centerx, start_button_rect.centery, center=True)
-
-        # Quiz button
-        quiz_button_rect = pygame.Rect(350, y_offset + 50, 150, 50)
-        quiz_button_color = BUTTON_HOVER_COLOR if quiz_button_rect.collidepoint((mx, my)) else BUTTON_COLOR
-        pygame.draw.rect(screen, quiz_button_color, quiz_button_rect, border_radius=10)
-        draw_text('Quiz', button_font, WHITE, screen, quiz_button_rect.centerx, quiz_button_rect.centery, center=True)
-
-        # Event handling
-        for event in pygame.event.get():
+        if full_redraw:
+            mx, my = pygame.mouse.get_pos()
+            start_hover = start_button_rect.collidepoint((mx, my))
+            quiz_hover = quiz_button_rect.collidepoint((mx, my))
+            draw_all()
+            full_redraw = False
+
+        # Sleep until something happens instead of redrawing at a fixed frame rate
+        events = [pygame.event.wait(IDLE_TIMEOUT)] + pygame.event.get()
+        dirty = set()
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
 
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
+
+            elif event.type == pygame.MOUSEMOTION:
+                mx, my = event.pos
+                hovered = start_button_rect.collidepoint((mx, my))
+                if hovered != start_hover:
+                    start_hover = hovered
+                    dirty.add('start')
+                hovered = quiz_button_rect.collidepoint((mx, my))
+                if hovered != quiz_hover:
+                    quiz_hover = hovered
+                    dirty.add('quiz')
+
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
+                    mx, my = event.pos
                     # Check if any input box is clicked
+                    previous_input = active_input
                     for i, box in enumerate(input_boxes):
                         if box['rect'].collidepoint((mx, my)):
                             active_input = i
                             break
                     else:
                         active_input = None
+                    if active_input != previous_input:
+                        dirty.update(i for i in (previous_input, active_input) if i is not None)
 
                     # Check if start button is clicked
                     if start_button_rect.collidepoint((mx, my)):
@@ -129,19 +157,23 @@ def menu(screen, username):
                         except ValueError:
                             # Invalid input handling
                             error_message = "Please enter valid numerical values."
-                            error_surface = label_font.render(error_message, True, pygame.Color('red'))
-                            screen.blit(error_surface, (50, y_offset))
-                            pygame.display.flip()
+                            error_surface = render_text(error_message, label_font, pygame.Color('red'))
+                            error_rect = screen.blit(error_surface, (50, y_offset))
+                            pygame.display.update(error_rect)
                             pygame.time.wait(2000)
+                            screen.blit(background, error_rect, error_rect)
+                            pygame.display.update(error_rect)
                         else:
                             return num_particles, box_size, particle_radius, temperature, dt, total_steps
 
                     # Check if quiz button is clicked
                     if quiz_button_rect.collidepoint((mx, my)):
                         quiz_ui(screen, username)
+                        full_redraw = True
 
             elif event.type == pygame.KEYDOWN:
                 if active_input is not None:
+                    dirty.add(active_input)
                     if event.key == pygame.K_BACKSPACE:
                         input_boxes[active_input]['value'] = input_boxes[active_input]['value'][:-1]
                     elif event.key == pygame.K_RETURN:
@@ -149,6 +181,14 @@ def menu(screen, username):
                     else:
                         input_boxes[active_input]['value'] += event.unicode
 
-        pygame.display.flip()
-        clock.tick(60)
-
+        # Redraw and push only the widgets whose state changed
+        if dirty and not full_redraw:
+            rects = []
+            for item in dirty:
+                if item == 'start':
+                    rects.append(draw_button(start_button_rect, 'Start', start_hover))
+                elif item == 'quiz':
+                    rects.append(draw_button(quiz_button_rect, 'Quiz', quiz_hover))
+                else:
+                    rects.append(draw_input_box(item))
+            pygame.display.update(rects)
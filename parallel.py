@@ -0,0 +1,304 @@
+# parallel.py
+import json
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import numpy as np
+from checkpoint import rng_state, restore_rng_state
+from collisions import CellList, CollisionEngine, apply_pair_updates
+from particles import reflect_off_walls
+
+# Per-particle arrays in the shared block, as (name, columns)
+FIELDS = (('positions', 2), ('velocities', 2), ('masses', 1), ('radii', 1))
+
+
+def shared_arrays(buffer, num_particles, dtype):
+    """Views of every FIELDS array inside a shared memory buffer."""
+    arrays = {}
+    offset = 0
+    for name, columns in FIELDS:
+        shape = (num_particles, columns) if columns > 1 else (num_particles,)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+        offset += num_particles * columns * dtype.itemsize
+    return arrays
+
+
+def shared_size(num_particles, dtype):
+    return max(1, num_particles * sum(columns for _, columns in FIELDS) * dtype.itemsize)
+
+
+def slab_of(x, width, slabs):
+    # The outermost slabs also take anything beyond the box edges
+    return np.clip(np.floor(x / width), 0, slabs - 1).astype(np.int64)
+
+
+class _LocalStore:
+    """The attributes of a ParticleStore that CollisionEngine.pair_updates reads, for a subset of particles."""
+
+    def __init__(self, arrays, index):
+        self.positions = arrays['positions'][index]
+        self.velocities = arrays['velocities'][index]
+        self.masses = arrays['masses'][index]
+        self.radii = arrays['radii'][index]
+
+
+def resolve_subset(engine, arrays, index, i_idx, j_idx):
+    """Resolve candidate pairs among the particles `index` in place; returns (pair checks, collisions, virial)."""
+    updates = engine.pair_updates(_LocalStore(arrays, index), i_idx, j_idx)
+    if updates is not None:
+        local, positions, velocities = updates
+        apply_pair_updates(arrays['positions'], arrays['velocities'], (index[local], positions, velocities))
+    return engine.pair_checks, engine.collisions, engine.virial
+
+
+class Slab:
+    """One worker's strip of the box, box_size * k / slabs <= x < box_size * (k + 1) / slabs.
+
+    The slab keeps the list of particles it owns and only ever looks at those and at
+    the border it is given. Particles that have left the strip are reported during the
+    move phase and join their new slab from the collision phase on, so ownership is
+    fixed for a whole step by the positions at its start.
+    """
+
+    def __init__(self, arrays, index, slabs, box_size, interaction_range, min_cell_size, rng):
+        self.arrays = arrays
+        self.index = index
+        self.slabs = slabs
+        self.box_size = box_size
+        self.width = box_size / slabs
+        self.low = index * self.width
+        self.high = (index + 1) * self.width
+        # Shifts into the slab's cell grid, in the state's dtype so no float64 copy is made
+        dtype = arrays['positions'].dtype
+        self.interior_origin = np.array((self.low, 0.0), dtype=dtype)
+        self.boundary_origin = np.array((self.high - self.width / 2, 0.0), dtype=dtype)
+        self.interaction_range = interaction_range
+        self.cells = CellList((self.width, box_size), min_cell_size=min_cell_size)
+        self.engine = CollisionEngine(box_size, rng)
+        # The only scan over all particles, once at start-up
+        self.own = np.flatnonzero(slab_of(arrays['positions'][:, 0], self.width, slabs) == index)
+        self.right_border = np.empty(0, dtype=np.int64)
+
+    def move(self, dt):
+        """Move the slab's particles by dt and reflect them off the walls.
+
+        Returns (wall impulse, largest speed, leavers, their new slabs). Leavers are the
+        particles that were outside the strip at the start of the step; they are still
+        moved here and belong to their new slab from the collision phase on.
+        """
+        arrays = self.arrays
+        own = self.own
+        positions = arrays['positions'][own]
+        velocities = arrays['velocities'][own]
+        destination = slab_of(positions[:, 0], self.width, self.slabs)
+        leaving = destination != self.index
+        speed_sq = np.einsum('ij,ij->i', velocities, velocities)
+        max_speed = float(np.sqrt(speed_sq.max())) if len(own) else 0.0
+
+        positions += velocities * dt
+        impulse = reflect_off_walls(positions, velocities, arrays['masses'][own], arrays['radii'][own],
+                                    self.box_size)
+        arrays['positions'][own] = positions
+        arrays['velocities'][own] = velocities
+        self.own = own[~leaving]
+        return impulse, max_speed, own[leaving], destination[leaving]
+
+    def collide(self, incoming, margin):
+        """Take over `incoming` and resolve the pairs among the slab's particles in place.
+
+        Returns the pair counters, the slab's kinetic energy and its left and right
+        borders: its particles within `margin` of either edge, the only ones that can
+        touch a particle of another slab.
+        """
+        arrays = self.arrays
+        if len(incoming):
+            # Kept sorted so pair order, and with it the result, does not depend on the slab's history
+            self.own = np.sort(np.concatenate((self.own, incoming)))
+        own = self.own
+        checks, collisions, virial = 0, 0, 0.0
+        if len(own) > 1:
+            shifted = arrays['positions'][own] - self.interior_origin
+            self.cells.resize(self.interaction_range, len(own))
+            i_idx, j_idx = self.cells.candidate_pairs(shifted)
+            checks, collisions, virial = resolve_subset(self.engine, arrays, own, i_idx, j_idx)
+
+        velocities = arrays['velocities'][own]
+        speed_sq = np.einsum('ij,ij->i', velocities, velocities).astype(np.float64, copy=False)
+        kinetic_energy = 0.5 * float(np.dot(arrays['masses'][own].astype(np.float64, copy=False), speed_sq))
+        x = arrays['positions'][own, 0]
+        left_border = own[x < self.low + margin]
+        self.right_border = own[x >= self.high - margin]
+        return checks, collisions, virial, kinetic_energy, left_border, self.right_border
+
+    def settle(self, ghosts):
+        """Resolve pairs between this slab's right border and `ghosts`, the next slab's left border."""
+        n_right = len(self.right_border)
+        if not n_right or not len(ghosts):
+            return 0, 0, 0.0
+        local = np.concatenate((self.right_border, ghosts))
+        # Centre the boundary in the slab-sized cell grid
+        shifted = self.arrays['positions'][local] - self.boundary_origin
+        self.cells.resize(self.interaction_range, len(local))
+        i_idx, j_idx = self.cells.candidate_pairs(shifted)
+        across = (i_idx < n_right) != (j_idx < n_right)
+        return resolve_subset(self.engine, self.arrays, local, i_idx[across], j_idx[across])
+
+    def rng_state(self):
+        return rng_state(self.engine.rng)
+
+    def load_rng_state(self, state):
+        restore_rng_state(self.engine.rng, state)
+
+
+def slab_worker(shm_name, num_particles, dtype, index, slabs, box_size, interaction_range, min_cell_size,
+                seed, connection):
+    """Serve move/collide/settle commands for one slab until told to stop."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    slab = Slab(shared_arrays(shm.buf, num_particles, np.dtype(dtype)), index, slabs, box_size,
+                interaction_range, min_cell_size, np.random.default_rng(seed))
+    connection.send('ready')
+    try:
+        while True:
+            command, *args = connection.recv()
+            if command == 'stop':
+                break
+            connection.send(getattr(slab, command)(*args))
+    finally:
+        slab = None
+        shm.close()
+        connection.close()
+
+
+class SlabEngine:
+    """Steps a ParticleStore with one worker process per vertical slab of the box.
+
+    The store's arrays are moved into one multiprocessing.shared_memory block, so the
+    workers and the rest of the simulation (rendering, statistics, checkpoints) all
+    see the same particles without copying. Each step has three phases separated by a
+    round trip to every worker: move and reflect off the walls, handing particles that
+    changed slab to their new owner; resolve the collisions inside each slab; resolve
+    the collisions across each slab boundary. Workers only touch their own particles
+    and the borders next to them, so each does O(N / slabs) work per step. Boundary
+    pairs are resolved after the pairs inside the slabs, each from the current state,
+    so kinetic energy is conserved across boundaries as well. When a slab is narrower
+    than its two borders together (very fast particles or many slabs) this process
+    resolves the boundary pairs instead. The number of slabs is capped so that each is
+    at least one interaction range wide.
+    """
+
+    def __init__(self, store, box_size, workers, seed=None, min_cell_size=None):
+        self.box_size = box_size
+        self.store = store
+        self.dtype = store.dtype
+        num_particles = len(store)
+        self.interaction_range = 2 * float(store.radii.max()) if num_particles else 1.0
+        self.slabs = max(1, min(workers, int(box_size // self.interaction_range)))
+        self.width = box_size / self.slabs
+        self.cells = CellList(box_size, min_cell_size=min_cell_size)
+        self.engine = CollisionEngine(box_size, np.random.default_rng(seed))
+        self.pair_checks = 0
+        self.collisions = 0
+        self.virial = 0.0
+
+        # Move the particle state into shared memory; the store keeps working on the views
+        self.shm = shared_memory.SharedMemory(create=True, size=shared_size(num_particles, self.dtype))
+        self.arrays = shared_arrays(self.shm.buf, num_particles, self.dtype)
+        for name, _ in FIELDS:
+            np.copyto(self.arrays[name], getattr(store, name))
+            setattr(store, name, self.arrays[name])
+
+        context = mp.get_context('spawn')
+        seeds = np.random.SeedSequence(seed).spawn(self.slabs)
+        self.connections = []
+        self.processes = []
+        for index in range(self.slabs):
+            parent, child = context.Pipe()
+            process = context.Process(target=slab_worker, daemon=True,
+                                      args=(self.shm.name, num_particles, self.dtype.str, index, self.slabs,
+                                            box_size, self.interaction_range, min_cell_size, seeds[index], child))
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        # Every slab must have claimed its particles before any of them moves
+        for connection in self.connections:
+            connection.recv()
+
+    def _broadcast(self, command, args):
+        for connection, slab_args in zip(self.connections, args):
+            connection.send((command, *slab_args))
+        return [connection.recv() for connection in self.connections]
+
+    def step(self, dt):
+        """Move, reflect and collide all particles; returns (wall impulse, kinetic energy)."""
+        moved = self._broadcast('move', [(dt,)] * self.slabs)
+        wall_impulse = sum(result[0] for result in moved)
+        # How far a particle can be from its slab, or be pushed by overlap corrections,
+        # and still touch a particle of another slab
+        margin = 2 * self.interaction_range + max(result[1] for result in moved) * abs(dt)
+        incoming = [[] for _ in range(self.slabs)]
+        for _, _, leavers, destinations in moved:
+            for index in np.unique(destinations):
+                incoming[index].append(leavers[destinations == index])
+        incoming = [np.concatenate(parts) if parts else np.empty(0, dtype=np.int64) for parts in incoming]
+
+        collided = self._broadcast('collide', [(parts, margin) for parts in incoming])
+        counters = [result[:3] for result in collided]
+        if self.width >= 2 * margin:
+            # Neighbouring boundaries share no particle, so they are settled in parallel
+            ghosts = [result[4] for result in collided[1:]] + [np.empty(0, dtype=np.int64)]
+            counters += self._broadcast('settle', [(border,) for border in ghosts])
+        else:
+            counters.append(self._settle_here([np.union1d(result[4], result[5]) for result in collided]))
+        self.pair_checks = sum(c[0] for c in counters)
+        self.collisions = sum(c[1] for c in counters)
+        self.virial = sum(c[2] for c in counters)
+        # Boundary collisions are elastic, so the energy summed before them still holds
+        return wall_impulse, sum(result[3] for result in collided)
+
+    def _settle_here(self, borders):
+        """Resolve the pairs across every slab boundary in this process."""
+        local = np.concatenate(borders)
+        if len(local) < 2:
+            return 0, 0, 0.0
+        owner = np.repeat(np.arange(self.slabs), [len(border) for border in borders])
+        self.cells.resize(self.interaction_range, len(local))
+        i_idx, j_idx = self.cells.candidate_pairs(self.arrays['positions'][local])
+        across = owner[i_idx] != owner[j_idx]
+        return resolve_subset(self.engine, self.arrays, local, i_idx[across], j_idx[across])
+
+    def resolve(self, store):
+        """Collision phases only, for use as a drop-in collider; returns the number of collisions."""
+        # A zero-length step hands over particles and collides without moving anything
+        self.step(0.0)
+        return self.collisions
+
+    def state(self):
+        # The random streams that place coincident particles apart, this process's first
+        states = [rng_state(self.engine.rng)] + self._broadcast('rng_state', [()] * self.slabs)
+        return {'rng': np.array(json.dumps(states))}
+
+    def load_state(self, state):
+        """Continue the checkpointed random streams; a run with another slab count starts fresh ones."""
+        if 'rng' not in state:
+            return
+        states = json.loads(str(state['rng']))
+        if len(states) != self.slabs + 1:
+            return
+        restore_rng_state(self.engine.rng, states[0])
+        self._broadcast('load_rng_state', [(state,) for state in states[1:]])
+
+    def close(self):
+        if self.shm is None:
+            return
+        for connection in self.connections:
+            connection.send(('stop',))
+            connection.close()
+        for process in self.processes:
+            process.join()
+        # Hand the store private copies before the shared block goes away
+        for name, _ in FIELDS:
+            setattr(self.store, name, getattr(self.store, name).copy())
+        self.arrays = None
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
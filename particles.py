@@ -0,0 +1,113 @@
+# particles.py
+import pygame
+import numpy as np
+from constants import WHITE
+
+
+class ParticleStore:
+    """Structure-of-arrays storage for all particles in a simulation.
+
+    All arrays share `dtype`. float32 halves the memory held by the particle state and
+    the per-pair temporaries of a step: collision code keeps intermediates in the
+    state's dtype and indexes with int32, so only energy and impulse reductions are
+    accumulated in float64.
+    """
+
+    def __init__(self, positions, velocities, masses, radii, dtype=np.float64):
+        self.positions = np.ascontiguousarray(positions, dtype=dtype).reshape(-1, 2)
+        self.velocities = np.ascontiguousarray(velocities, dtype=dtype).reshape(-1, 2)
+        n = len(self.positions)
+        self.masses = np.broadcast_to(np.asarray(masses, dtype=dtype), (n,)).copy()
+        self.radii = np.broadcast_to(np.asarray(radii, dtype=dtype), (n,)).copy()
+
+    @property
+    def dtype(self):
+        return self.positions.dtype
+
+    def __len__(self):
+        return len(self.positions)
+
+    def move(self, dt):
+        self.positions += self.velocities * dt
+
+    def wall_collision(self, box_size):
+        """Reflect particles off the box walls and return the total wall impulse."""
+        return reflect_off_walls(self.positions, self.velocities, self.masses, self.radii, box_size)
+
+    def wrap(self, box_size):
+        """Map positions back into the box for periodic boundaries."""
+        np.mod(self.positions, box_size, out=self.positions)
+        # mod can round up to exactly box_size for tiny negative values
+        self.positions[self.positions >= box_size] = 0.0
+
+    def kinetic_energy(self):
+        speed_sq = np.einsum('ij,ij->i', self.velocities, self.velocities)
+        # Reduce in float64 even when the state is single precision
+        return 0.5 * float(np.dot(self.masses.astype(np.float64, copy=False),
+                                  speed_sq.astype(np.float64, copy=False)))
+
+
+def reflect_off_walls(positions, velocities, masses, radii, box_size):
+    """Reflect discs off the walls of the box in place and return the total wall impulse."""
+    r = radii[:, None]
+    low = positions - r < 0
+    high = positions + r > box_size
+    hit = low | high
+    if not hit.any():
+        return 0.0
+    np.copyto(positions, r, where=low)
+    np.copyto(positions, box_size - r, where=high)
+    velocities[hit] *= -1
+    impulse = 2 * np.abs(masses[:, None] * velocities)
+    return float(impulse[hit].sum(dtype=np.float64))
+
+
+class Particle:
+    """Thin view onto a single row of a ParticleStore."""
+
+    def __init__(self, store, index):
+        self.store = store
+        self.index = index
+
+    @property
+    def position(self):
+        return self.store.positions[self.index]
+
+    @position.setter
+    def position(self, value):
+        self.store.positions[self.index] = value
+
+    @property
+    def velocity(self):
+        return self.store.velocities[self.index]
+
+    @velocity.setter
+    def velocity(self, value):
+        self.store.velocities[self.index] = value
+
+    @property
+    def mass(self):
+        return self.store.masses[self.index]
+
+    @property
+    def radius(self):
+        return self.store.radii[self.index]
+
+    def move(self, dt):
+        self.position += self.velocity * dt
+
+    def wall_collision(self, box_size):
+        impulse = 0.0
+        for i in range(2):
+            if self.position[i] - self.radius < 0:
+                self.position[i] = self.radius
+                self.velocity[i] = -self.velocity[i]
+                impulse += 2 * abs(self.mass * self.velocity[i])
+            elif self.position[i] + self.radius > box_size:
+                self.position[i] = box_size - self.radius
+                self.velocity[i] = -self.velocity[i]
+                impulse += 2 * abs(self.mass * self.velocity[i])
+        return impulse
+
+    def draw(self, screen):
+        pygame.draw.circle(screen, WHITE, self.position.astype(int), self.radius)
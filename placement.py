@@ -0,0 +1,129 @@
+# placement.py
+import numpy as np
+
+
+def lattice_positions(num_particles, box_size, radius, rng=np.random):
+    """Place particles on a jittered square lattice, falling back to a hexagonal one when dense.
+
+    Raises ValueError when even hexagonal close packing cannot fit the requested count.
+    """
+    per_row = int(np.ceil(np.sqrt(num_particles))) if num_particles else 0
+    spacing = box_size / max(per_row, 1)
+    if spacing < 2 * radius:
+        return hexagonal_positions(num_particles, box_size, radius, rng)
+
+    # One random subset of the sites, each jittered inside its own cell so neighbours never touch
+    sites = rng.permutation(per_row * per_row)[:num_particles]
+    cells = np.column_stack((sites // per_row, sites % per_row)).astype(float)
+    centres = (cells + 0.5) * spacing
+    jitter = 0.5 * (spacing - 2 * radius)
+    return centres + rng.uniform(-jitter, jitter, (num_particles, 2))
+
+
+def hexagonal_positions(num_particles, box_size, radius, rng=np.random):
+    """Place particles on a hexagonal close-packed lattice, the densest arrangement possible."""
+    span = box_size - 2 * radius
+    row_height = np.sqrt(3) * radius
+    rows = int(span // row_height) + 1 if span >= 0 else 0
+    xs_even = radius + 2 * radius * np.arange(int(span // (2 * radius)) + 1 if span >= 0 else 0)
+    xs_odd = xs_even + radius
+    xs_odd = xs_odd[xs_odd <= box_size - radius]
+
+    sites = []
+    for row in range(rows):
+        xs = xs_even if row % 2 == 0 else xs_odd
+        sites.append(np.column_stack((xs, np.full(len(xs), radius + row * row_height))))
+    sites = np.concatenate(sites) if sites else np.empty((0, 2))
+    if len(sites) < num_particles:
+        raise ValueError(f"Cannot fit {num_particles} particles of radius {radius} in a box of size "
+                         f"{box_size}; at most {len(sites)} fit even in close packing.")
+    return sites[rng.permutation(len(sites))[:num_particles]]
+
+
+def poisson_disk_positions(num_particles, box_size, radius, rng=np.random, max_rounds=200):
+    """Grid-accelerated Poisson-disk sampling by batched dart throwing.
+
+    Candidates are drawn in batches and tested against a background grid whose cells are
+    small enough to hold a single particle, so each test only looks at a 5x5 block of
+    cells. Returns fewer than `num_particles` positions if the sampler saturates.
+    """
+    min_dist = 2 * radius
+    span = box_size - 2 * radius
+    if num_particles == 0 or span < 0:
+        return np.empty((0, 2))
+    cell = min_dist / np.sqrt(2)
+    grid_size = max(1, int(np.ceil(span / cell)))
+    grid = np.full((grid_size + 4, grid_size + 4), -1, dtype=np.int64)  # Padded by 2 on every side
+    positions = np.zeros((num_particles, 2))
+    placed = 0
+    stalls = 0
+    # Cells two apart diagonally are already 2r apart, so the 5x5 block's corners are skipped
+    offsets = [(dx, dy) for dx in range(-2, 3) for dy in range(-2, 3) if (dx, dy) != (0, 0) and abs(dx * dy) != 4]
+
+    for _ in range(max_rounds):
+        remaining = num_particles - placed
+        if remaining == 0:
+            break
+        # Throw one dart into each of a random subset of the still-empty cells
+        free = np.flatnonzero(grid[2:-2, 2:-2] == -1)
+        if len(free) == 0:
+            break
+        if len(free) > 2 * remaining:
+            free = rng.choice(free, 2 * remaining, replace=False)
+        cells = np.column_stack((free // grid_size, free % grid_size))
+        candidates = radius + (cells + rng.uniform(0, 1, (len(free), 2))) * cell
+        inside = (candidates <= box_size - radius).all(axis=1)
+        candidates = candidates[inside]
+        cells = cells[inside] + 2
+
+        # Mark the batch in the grid with negative ids so batch members can see each other
+        width = grid_size + 4
+        flat_grid = grid.ravel()
+        flat_cells = cells[:, 0] * width + cells[:, 1]
+        batch_ids = np.arange(len(candidates))
+        flat_grid[flat_cells] = -2 - batch_ids
+        ok = np.ones(len(candidates), dtype=bool)
+        for dx, dy in offsets:
+            neighbour = flat_grid[flat_cells + (dx * width + dy)]
+            # Placed particles block the candidate; within the batch the earlier candidate wins
+            placed_neighbour = neighbour >= 0
+            batch_neighbour = (neighbour <= -2) & (-2 - neighbour < batch_ids)
+            check = np.flatnonzero(placed_neighbour | batch_neighbour)
+            if len(check) == 0:
+                continue
+            other = neighbour[check]
+            other_pos = np.where((other >= 0)[:, None], positions[np.maximum(other, 0)],
+                                 candidates[np.maximum(-2 - other, 0)])
+            delta = candidates[check] - other_pos
+            ok[check[np.einsum('ij,ij->i', delta, delta) < min_dist ** 2]] = False
+        flat_grid[flat_cells] = -1
+
+        accepted = candidates[ok][:remaining]
+        ids = placed + np.arange(len(accepted))
+        accepted_cells = cells[ok][:remaining]
+        positions[ids] = accepted
+        grid[accepted_cells[:, 0], accepted_cells[:, 1]] = ids
+        placed += len(accepted)
+        # Saturated: a few rounds in a row without a single new particle
+        stalls = stalls + 1 if len(accepted) == 0 else 0
+        if stalls >= 5:
+            break
+    return positions[:placed]
+
+
+def place_particles(num_particles, box_size, radius, rng=np.random, strategy='auto'):
+    """Non-overlapping initial positions using 'poisson', 'lattice' or 'auto'.
+
+    'auto' uses Poisson-disk sampling for dilute systems and a jittered lattice once the
+    packing fraction is too high for random sampling to saturate; a Poisson-disk run that
+    saturates also falls back to the lattice. Only impossible densities raise ValueError.
+    """
+    if strategy not in ('auto', 'poisson', 'lattice'):
+        raise ValueError(f"Unknown placement strategy: {strategy}")
+    packing = num_particles * np.pi * radius ** 2 / box_size ** 2
+    if strategy == 'lattice' or (strategy == 'auto' and packing > 0.35):
+        return lattice_positions(num_particles, box_size, radius, rng)
+    positions = poisson_disk_positions(num_particles, box_size, radius, rng)
+    if len(positions) < num_particles:
+        return lattice_positions(num_particles, box_size, radius, rng)
+    return positions
@@ -0,0 +1,129 @@
+# plots.py
+import pygame
+import numpy as np
+from utils import render_text
+
+
+class MinMaxDecimator:
+    """Constant-memory min/max/mean summary of an unbounded series.
+
+    Samples are grouped into bins of `bin_size` samples. When more than `capacity`
+    bins exist, neighbouring bins are merged pairwise and the bin size doubles, so the
+    series is always summarised by between capacity/2 and capacity bins. Each bin
+    also keeps the time of its first sample, since samples need not be evenly spaced.
+    """
+
+    def __init__(self, capacity=512):
+        self.capacity = capacity - capacity % 2
+        self.bin_size = 1
+        self.mins = np.empty(self.capacity)
+        self.maxs = np.empty(self.capacity)
+        self.sums = np.empty(self.capacity)
+        self.times = np.empty(self.capacity)
+        self.bins = 0
+        self.count = 0
+        self._in_bin = 0
+
+    def add(self, value, time):
+        if self._in_bin == 0:
+            if self.bins == self.capacity:
+                self._merge()
+            k = self.bins
+            self.mins[k] = self.maxs[k] = self.sums[k] = value
+            self.times[k] = time
+            self.bins += 1
+        else:
+            k = self.bins - 1
+            self.mins[k] = min(self.mins[k], value)
+            self.maxs[k] = max(self.maxs[k], value)
+            self.sums[k] += value
+        self.count += 1
+        self._in_bin = (self._in_bin + 1) % self.bin_size
+
+    def _merge(self):
+        half = self.capacity // 2
+        self.mins[:half] = np.minimum(self.mins[0::2], self.mins[1::2])
+        self.maxs[:half] = np.maximum(self.maxs[0::2], self.maxs[1::2])
+        self.sums[:half] = self.sums[0::2] + self.sums[1::2]
+        self.times[:half] = self.times[0::2]
+        self.bins = half
+        self.bin_size *= 2
+
+    def summary(self):
+        """(first sample index, min, max, mean) of every bin, oldest first."""
+        n = self.bins
+        starts = np.arange(n) * self.bin_size
+        sizes = np.minimum(self.bin_size, self.count - starts)
+        return starts, self.mins[:n], self.maxs[:n], self.sums[:n] / sizes
+
+
+class StripChart:
+    """Live chart of a series drawn as a min/max envelope; cost per frame is fixed by its width."""
+
+    def __init__(self, rect, label, color, font):
+        self.rect = pygame.Rect(rect)
+        self.label = label
+        self.color = color
+        self.font = font
+        self.series = MinMaxDecimator(2 * self.rect.width)
+
+    def add(self, value, time):
+        self.series.add(value, time)
+
+    def draw(self, screen):
+        rect = self.rect
+        pygame.draw.rect(screen, (20, 20, 20), rect)
+        pygame.draw.rect(screen, (80, 80, 80), rect, 1)
+        _, mins, maxs, _ = self.series.summary()
+        if len(mins):
+            low = mins.min()
+            high = maxs.max()
+            span = high - low if high > low else 1.0
+            # One column per bin at most; bins sharing a column are combined
+            columns = np.minimum((np.arange(len(mins)) * (rect.width - 2) // max(len(mins), 1)), rect.width - 3)
+            col_min = np.full(rect.width, np.inf)
+            col_max = np.full(rect.width, -np.inf)
+            np.minimum.at(col_min, columns, mins)
+            np.maximum.at(col_max, columns, maxs)
+            used = np.flatnonzero(np.isfinite(col_min))
+            xs = rect.x + 1 + used
+            scale = (rect.height - 4) / span
+            y_min = rect.bottom - 2 - ((col_min[used] - low) * scale).astype(int)
+            y_max = rect.bottom - 2 - ((col_max[used] - low) * scale).astype(int)
+            if len(xs) > 1:
+                pygame.draw.lines(screen, self.color, False, np.column_stack((xs, y_max)).tolist())
+                pygame.draw.lines(screen, self.color, False, np.column_stack((xs, y_min)).tolist())
+            text = render_text(f'{self.label} [{low:.3g}, {high:.3g}]', self.font, (255, 255, 255))
+        else:
+            text = render_text(self.label, self.font, (255, 255, 255))
+        screen.blit(text, (rect.x + 4, rect.y + 2))
+
+
+def export_decimated(path, charts):
+    """Save the decimated series of each chart to an .npz for later plotting."""
+    arrays = {}
+    for chart in charts:
+        _, mins, maxs, means = chart.series.summary()
+        name = chart.label.lower()
+        arrays[f'{name}_times'] = chart.series.times[:chart.series.bins].copy()
+        arrays[f'{name}_min'] = mins
+        arrays[f'{name}_max'] = maxs
+        arrays[f'{name}_mean'] = means
+    np.savez(path, **arrays)
+
+
+def plot_exported(path):
+    """Plot a file written by export_decimated with matplotlib."""
+    import matplotlib.pyplot as plt
+    data = np.load(path)
+    names = sorted({key.rsplit('_', 1)[0] for key in data.files})
+    fig, axs = plt.subplots(len(names), 1, figsize=(8, 4 * len(names)), squeeze=False)
+    for ax, name in zip(axs[:, 0], names):
+        times = data[f'{name}_times']
+        ax.fill_between(times, data[f'{name}_min'], data[f'{name}_max'], alpha=0.3)
+        ax.plot(times, data[f'{name}_mean'])
+        ax.set_title(f'{name.capitalize()} Over Time')
+        ax.set_xlabel('Time')
+        ax.set_ylabel(name.capitalize())
+    plt.tight_layout()
+    plt.show()
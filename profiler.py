@@ -0,0 +1,87 @@
+# profiler.py
+import json
+import time
+import numpy as np
+
+
+class StepProfiler:
+    """Low-overhead per-phase timers and counters for the simulation loop.
+
+    Call `start()` at the beginning of a section and `lap(phase, t0)` after each phase;
+    `lap` returns the new start time so phases can be chained. While disabled both
+    return immediately without reading the clock. The last `window` samples of every
+    phase and counter are kept in ring buffers for rolling percentiles.
+    """
+
+    PHASES = ('move', 'walls', 'collisions', 'events', 'statistics', 'draw', 'text', 'flip')
+    COUNTERS = ('pair_checks', 'collision_count')
+
+    def __init__(self, enabled=False, window=600):
+        self.enabled = enabled
+        self.window = window
+        self.samples = {name: np.zeros(window) for name in self.PHASES + self.COUNTERS}
+        self.counts = dict.fromkeys(self.PHASES + self.COUNTERS, 0)
+        self.totals = dict.fromkeys(self.PHASES + self.COUNTERS, 0.0)
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def lap(self, phase, t0):
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self._add(phase, now - t0)
+        return now
+
+    def count(self, name, value):
+        if self.enabled:
+            self._add(name, value)
+
+    def _add(self, name, value):
+        n = self.counts[name]
+        self.samples[name][n % self.window] = value
+        self.counts[name] = n + 1
+        self.totals[name] += value
+
+    def recent(self, name):
+        return self.samples[name][:min(self.counts[name], self.window)]
+
+    def percentiles(self, name, q=(50, 90, 99)):
+        values = self.recent(name)
+        return np.percentile(values, q) if len(values) else np.zeros(len(q))
+
+    def hud_lines(self):
+        """Median time per phase (ms) and median counters over the rolling window."""
+        lines = []
+        for phase in self.PHASES:
+            if self.counts[phase]:
+                lines.append(f'{phase}: {self.percentiles(phase, (50,))[0] * 1e3:.2f} ms')
+        for counter in self.COUNTERS:
+            if self.counts[counter]:
+                lines.append(f'{counter}: {self.percentiles(counter, (50,))[0]:.0f}')
+        return lines
+
+    def report(self):
+        report = {'window': self.window, 'phases': {}, 'counters': {}}
+        for phase in self.PHASES:
+            if self.counts[phase]:
+                p50, p90, p99 = self.percentiles(phase) * 1e3
+                report['phases'][phase] = {
+                    'calls': self.counts[phase],
+                    'total_s': self.totals[phase],
+                    'mean_ms': self.totals[phase] / self.counts[phase] * 1e3,
+                    'p50_ms': p50, 'p90_ms': p90, 'p99_ms': p99,
+                }
+        for counter in self.COUNTERS:
+            if self.counts[counter]:
+                p50, p90, p99 = self.percentiles(counter)
+                report['counters'][counter] = {
+                    'samples': self.counts[counter],
+                    'total': self.totals[counter],
+                    'p50': p50, 'p90': p90, 'p99': p99,
+                }
+        return report
+
+    def dump(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
@@ -2,14 +2,16 @@
 import pygame
 import sys
 from database import save_quiz_result  # Import your function to save results
+from utils import get_font, render_text
+from constants import IDLE_TIMEOUT
+
 
 def quiz_ui(screen, username):
     pygame.init()
-    clock = pygame.time.Clock()
 
     # Load fonts
-    font = pygame.font.SysFont('Arial', 24)
-    small_font = pygame.font.SysFont('Arial', 18)
+    font = get_font('Arial', 24)
+    small_font = get_font('Arial', 18)
 
     # Define quiz questions and answers
     questions = [
@@ -31,20 +33,62 @@ def quiz_ui(screen, username):
     selected_option = None
     score = 0
 
-    run = True
-    while run:
+    next_button_rect = pygame.Rect(300, 500, 100, 50)
+    option_rects = []
+
+    def draw_option(i):
+        color = (200, 200, 200)
+        if selected_option == i:
+            color = (100, 100, 255)
+        option = questions[current_question]['options'][i]
+        option_text = render_text(f"{i + 1}. {option}", small_font, color)
+        rect = option_rects[i]
+        screen.fill((0, 0, 0), rect)
+        screen.blit(option_text, rect)
+        return rect
+
+    def draw_question():
+        # Full redraw, only needed when the question changes
         screen.fill((0, 0, 0))  # Clear screen with black
+        question_text = render_text(questions[current_question]['question'], font, (255, 255, 255))
+        screen.blit(question_text, (50, 50))
+
+        # Draw options
+        option_rects.clear()
+        y_offset = 150
+        for option in questions[current_question]['options']:
+            option_text = render_text(f"{len(option_rects) + 1}. {option}", small_font, (200, 200, 200))
+            option_rects.append(option_text.get_rect(topleft=(70, y_offset)))
+            y_offset += 40
+        for i in range(len(option_rects)):
+            draw_option(i)
 
-        for event in pygame.event.get():
+        # Draw 'Next' button
+        pygame.draw.rect(screen, (0, 128, 255), next_button_rect)
+        next_text = render_text("Next", font, (255, 255, 255))
+        screen.blit(next_text, (next_button_rect.x + 15, next_button_rect.y + 10))
+        pygame.display.flip()
+
+    draw_question()
+    run = True
+    while run:
+        # Sleep until something happens; redraw only what changed
+        events = [pygame.event.wait(IDLE_TIMEOUT)] + pygame.event.get()
+        dirty = []
+        full_redraw = False
+        for event in events:
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
+            elif event.type in (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                full_redraw = True
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
-                    mx, my = pygame.mouse.get_pos()
+                    mx, my = event.pos
                     # Check if an option is clicked
                     for i, option_rect in enumerate(option_rects):
-                        if option_rect.collidepoint((mx, my)):
+                        if option_rect.collidepoint((mx, my)) and selected_option != i:
+                            dirty.extend(k for k in (selected_option, i) if k is not None)
                             selected_option = i
                     # Check if 'Next' button is clicked
                     if next_button_rect.collidepoint((mx, my)):
@@ -55,41 +99,22 @@ def quiz_ui(screen, username):
                             selected_option = None
                             if current_question >= len(questions):
                                 run = False  # End quiz
+                                break
+                            full_redraw = True
 
-        if current_question < len(questions):
-            # Draw question
-            question_text = font.render(questions[current_question]['question'], True, (255, 255, 255))
-            screen.blit(question_text, (50, 50))
-
-            # Draw options
-            option_rects = []
-            y_offset = 150
-            for i, option in enumerate(questions[current_question]['options']):
-                color = (200, 200, 200)
-                if selected_option == i:
-                    color = (100, 100, 255)
-                option_text = small_font.render(f"{i + 1}. {option}", True, color)
-                option_rect = option_text.get_rect(topleft=(70, y_offset))
-                screen.blit(option_text, option_rect)
-                option_rects.append(option_rect)
-                y_offset += 40
-
-            # Draw 'Next' button
-            next_button_rect = pygame.Rect(300, 500, 100, 50)
-            pygame.draw.rect(screen, (0, 128, 255), next_button_rect)
-            next_text = font.render("Next", True, (255, 255, 255))
-            screen.blit(next_text, (next_button_rect.x + 15, next_button_rect.y + 10))
-        else:
-            # Quiz is over, display final score
-            screen.fill((0, 0, 0))
-            final_text = font.render(f"Your score: {score}/{len(questions)}", True, (255, 255, 255))
-            screen.blit(final_text, (200, 300))
-            pygame.display.flip()
-            pygame.time.wait(3000)  # Wait for 3 seconds before exiting
+        if not run:
             break
+        if full_redraw:
+            draw_question()
+        elif dirty:
+            pygame.display.update([draw_option(i) for i in dirty])
 
-        pygame.display.flip()
-        clock.tick(60)
+    # Quiz is over, display final score
+    screen.fill((0, 0, 0))
+    final_text = render_text(f"Your score: {score}/{len(questions)}", font, (255, 255, 255))
+    screen.blit(final_text, (200, 300))
+    pygame.display.flip()
+    pygame.time.wait(3000)  # Wait for 3 seconds before exiting
 
     # Save the quiz result
     save_quiz_result(username, score)
@@ -0,0 +1,131 @@
+# rendering.py
+import pygame
+import numpy as np
+from constants import WHITE
+
+
+def speed_palette(size):
+    """Blue (slow) through white to red (fast), as an array of RGB rows."""
+    t = np.linspace(0.0, 1.0, size)
+    red = np.clip(2 * t, 0, 1)
+    blue = np.clip(2 - 2 * t, 0, 1)
+    green = 1 - np.abs(2 * t - 1)
+    return (np.column_stack((red, green, blue)) * 255).astype(np.uint8)
+
+
+class SpriteRenderer:
+    """Draws every particle with one Surface.blits call using cached disc sprites.
+
+    A disc is rendered once per (radius, colour) and reused. Positions are converted to
+    integer blit coordinates in one vectorized operation. With `color_by_speed`,
+    particles pick one of `palette_size` pre-rendered colours from their speed, scaled so
+    that `max_speed` maps to the hottest colour.
+    """
+
+    def __init__(self, color=WHITE, color_by_speed=False, max_speed=1.0, palette_size=64):
+        self.color = color
+        self.color_by_speed = color_by_speed
+        self.max_speed = max_speed
+        self.palette = [tuple(int(c) for c in row) for row in speed_palette(palette_size)]
+        self.sprites = {}
+
+    def sprite(self, radius, color):
+        key = (radius, color)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            # Colour-keyed, run-length encoded sprites blit much faster than per-pixel alpha
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            key_color = (255, 0, 255) if color != (255, 0, 255) else (0, 0, 0)
+            sprite.fill(key_color)
+            pygame.draw.circle(sprite, color, (radius, radius), radius)
+            sprite.set_colorkey(key_color, pygame.RLEACCEL)
+            if pygame.display.get_surface() is not None:
+                sprite = sprite.convert()
+            self.sprites[key] = sprite
+        return sprite
+
+    def draw(self, screen, store):
+        if not len(store):
+            return
+        radii = np.maximum(np.rint(store.radii).astype(np.int64), 1)
+        corners = (store.positions - radii[:, None]).astype(np.int64).tolist()
+
+        if self.color_by_speed:
+            speed = np.sqrt(np.einsum('ij,ij->i', store.velocities, store.velocities))
+            last = len(self.palette) - 1
+            shades = np.minimum((speed * (last / self.max_speed)).astype(np.int64), last)
+        else:
+            shades = None
+
+        uniform_radius = radii[0] if (radii == radii[0]).all() else None
+        if uniform_radius is not None and shades is None:
+            sprite = self.sprite(int(uniform_radius), self.color)
+            screen.blits([(sprite, corner) for corner in corners], False)
+        elif uniform_radius is not None:
+            sprites = [self.sprite(int(uniform_radius), color) for color in self.palette]
+            screen.blits([(sprites[k], corner) for k, corner in zip(shades.tolist(), corners)], False)
+        else:
+            colors = [self.color] * len(radii) if shades is None else [self.palette[k] for k in shades.tolist()]
+            screen.blits([(self.sprite(r, color), corner)
+                          for r, color, corner in zip(radii.tolist(), colors, corners)], False)
+
+
+def heat_palette(size=256):
+    """Black through blue and cyan to white, for density maps."""
+    t = np.linspace(0.0, 1.0, size)
+    red = np.clip(3 * t - 2, 0, 1)
+    green = np.clip(3 * t - 1, 0, 1)
+    blue = np.clip(3 * t, 0, 1)
+    return (np.column_stack((red, green, blue)) * 255).astype(np.uint8)
+
+
+class DensityRenderer:
+    """Level-of-detail view for very large N: a binned density field instead of discs.
+
+    Positions are binned into a `resolution` x `resolution` grid with np.bincount,
+    mapped through a colour lookup table and pushed to a small surface with
+    pygame.surfarray, which is scaled to the screen in one blit. With
+    `temperature_overlay`, cells are coloured by their mean kinetic energy (blue cold,
+    red hot) and shaded by density. The per-frame cost beyond the binning depends only
+    on the resolution, not on the number of particles.
+    """
+
+    def __init__(self, box_size, screen_size, resolution=128, temperature_overlay=False, max_temperature=2.0):
+        self.box_size = box_size
+        self.screen_size = screen_size
+        self.resolution = resolution
+        self.temperature_overlay = temperature_overlay
+        self.max_temperature = max_temperature
+        self.density_lut = heat_palette(256)
+        self.temperature_lut = speed_palette(256)
+        self.small = pygame.Surface((resolution, resolution))
+        self.scaled = pygame.Surface(screen_size)
+
+    def bin(self, store):
+        res = self.resolution
+        cells = (store.positions * (res / self.box_size)).astype(np.int64)
+        np.clip(cells, 0, res - 1, out=cells)
+        # surfarray arrays are indexed [x, y]
+        flat = cells[:, 0] * res + cells[:, 1]
+        counts = np.bincount(flat, minlength=res * res)
+        return flat, counts
+
+    def draw(self, screen, store):
+        res = self.resolution
+        flat, counts = self.bin(store)
+        # Normalise so that four times the mean occupancy saturates the colour map
+        scale = 255.0 / max(4.0 * len(store) / (res * res), 1.0)
+        density = np.minimum(counts * scale, 255).astype(np.uint8)
+
+        if self.temperature_overlay:
+            speed_sq = np.einsum('ij,ij->i', store.velocities, store.velocities)
+            energy = np.bincount(flat, weights=0.5 * store.masses * speed_sq, minlength=res * res)
+            cell_temperature = energy / np.maximum(counts, 1)
+            shade = np.minimum(cell_temperature * (255 / self.max_temperature), 255).astype(np.uint8)
+            rgb = (self.temperature_lut[shade] * (density[:, None] / 255.0)).astype(np.uint8)
+        else:
+            rgb = self.density_lut[density]
+
+        pygame.surfarray.blit_array(self.small, rgb.reshape(res, res, 3))
+        pygame.transform.scale(self.small, self.screen_size, self.scaled)
+        screen.blit(self.scaled, (0, 0))
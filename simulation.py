@@ -1,194 +1,507 @@
 # simulation.py
+import time
 import pygame
 import numpy as np
 from constants import BLACK, WHITE
-
-class Particle:
-    def __init__(self, position, velocity, mass, radius):
-        self.position = np.array(position, dtype=float)
-        self.velocity = np.array(velocity, dtype=float)
-        self.mass = mass
-        self.radius = radius
-
-    def move(self, dt):
-        self.position += self.velocity * dt
-
-    def wall_collision(self, box_size):
-        impulse = 0.0
-        for i in range(2):
-            if self.position[i] - self.radius < 0:
-                self.position[i] = self.radius
-                self.velocity[i] = -self.velocity[i]
-                impulse += 2 * abs(self.mass * self.velocity[i])
-            elif self.position[i] + self.radius > box_size:
-                self.position[i] = box_size - self.radius
-                self.velocity[i] = -self.velocity[i]
-                impulse += 2 * abs(self.mass * self.velocity[i])
-        return impulse
-
-    def draw(self, screen):
-        pygame.draw.circle(screen, WHITE, self.position.astype(int), self.radius)
-
+from particles import Particle, ParticleStore
+from collisions import CollisionEngine, NeighborListEngine
+from events import EventDrivenEngine
+from placement import place_particles
+from stats import StatsRecorder, PressureEstimator
+from trajectory import TrajectoryRecorder
+from utils import get_font, render_text
+from plots import StripChart, export_decimated
+from rendering import SpriteRenderer, DensityRenderer
+from checkpoint import save_checkpoint, load_checkpoint, restore_rng_state
+from profiler import StepProfiler
+from background import PhysicsProcess
+from parallel import SlabEngine
+
+PLOT_PANEL_WIDTH = 320  # Width of the live chart panel next to the box
 
 class Simulation:
-    def __init__(self, num_particles, box_size, particle_radius, temperature, dt, total_steps):
+    def __init__(self, num_particles, box_size, particle_radius, temperature, dt, total_steps,
+                 neighbor_skin=None, engine='steps', headless=False, output_path=None,
+                 substeps=1, fps=60, seed=None, placement='auto', history=None, decimate=1,
+                 spill_path=None, record_path=None, record_every=1, checkpoint_path=None,
+                 checkpoint_every=None, color_by_speed=False, lod_threshold=50000, temperature_overlay=False,
+                 live_plots=False, profile=False, profile_path=None, background=False,
+                 adaptive_dt=None, pressure_estimator=None, pressure_window=100, pressure_tolerance=None,
+                 boundary='walls', cell_size=None, precision='float64', slab_workers=None):
+        # Arguments that define the physics of a run; stored in checkpoints
+        self.params = {
+            'num_particles': num_particles, 'box_size': box_size, 'particle_radius': particle_radius,
+            'temperature': temperature, 'dt': dt, 'total_steps': total_steps, 'neighbor_skin': neighbor_skin,
+            'engine': engine, 'seed': seed if isinstance(seed, int) else None, 'placement': placement,
+            'history': history, 'decimate': decimate, 'adaptive_dt': adaptive_dt,
+            'pressure_estimator': pressure_estimator, 'pressure_window': pressure_window,
+            'pressure_tolerance': pressure_tolerance, 'boundary': boundary, 'cell_size': cell_size,
+            'precision': precision,
+        }
         self.num_particles = num_particles
         self.box_size = box_size
         self.particle_radius = particle_radius
         self.temperature = temperature
         self.dt = dt
         self.total_steps = total_steps
+        # With adaptive_dt, each step is shortened so no particle moves more than this
+        # fraction of its radius; dt is then the upper limit. Ignored by the event engine.
+        self.adaptive_dt = adaptive_dt
+        self.last_dt = dt
+        self.time = 0.0
 
         self.mass = 1.0       # Mass of particles
         self.kb = 1.0         # Boltzmann constant
         self.display_stats = True
-
-        self.particles = []
+        # Private random stream when seeded, otherwise the global np.random state as before
+        self.rng = np.random if seed is None else np.random.default_rng(seed)
+        self.engine = engine  # 'steps' for fixed-dt stepping, 'events' for event-driven dynamics
+        if engine not in ('steps', 'events'):
+            raise ValueError(f"Unknown engine: {engine}")
+        # 'walls' for the hard box, 'periodic' for minimum-image bulk gas without walls
+        if boundary not in ('walls', 'periodic'):
+            raise ValueError(f"Unknown boundary: {boundary}")
+        self.periodic = boundary == 'periodic'
+        # 'float32' halves the memory traffic of the particle state; statistics stay float64
+        if precision not in ('float32', 'float64'):
+            raise ValueError(f"Unknown precision: {precision}")
+        self.dtype = np.dtype(precision)
+        if self.dtype == np.float32 and engine == 'events':
+            raise ValueError("The event engine needs float64 collision times")
+        if self.periodic and engine == 'events':
+            raise ValueError("Periodic boundaries need the 'steps' engine")
+        if pressure_estimator is None:
+            pressure_estimator = 'virial' if self.periodic else 'wall'
+        elif self.periodic and pressure_estimator != 'virial':
+            raise ValueError("Without walls the pressure must come from the 'virial' estimator")
+
+        self.placement = placement  # 'auto', 'poisson' or 'lattice'
+        self.store = None
         self.initialize_particles()
-
-        self.times = []
-        self.temperatures = []
-        self.pressures = []
-
-        # Screen setup
-        self.screen = pygame.display.set_mode((box_size, box_size))
-        pygame.display.set_caption('Ideal Gas Simulation')
+        # Optional Verlet neighbor list, rebuilt only once particles drift half the skin.
+        # Cells are at least one interaction range wide, or cell_size if that is larger.
+        if neighbor_skin:
+            self.collider = NeighborListEngine(box_size, neighbor_skin, self.rng, self.periodic, cell_size)
+        else:
+            self.collider = CollisionEngine(box_size, self.rng, self.periodic, cell_size)
+        self.events = EventDrivenEngine(self.store, box_size, cell_size) if engine == 'events' else None
+
+        # Optional domain decomposition: slab_workers processes step vertical slabs of the
+        # box in shared memory and stand in for the collider
+        self.cell_size = cell_size
+        self.slab_workers = slab_workers
+        self.parallel = None
+        if slab_workers and slab_workers > 1:
+            if engine != 'steps' or neighbor_skin or self.periodic or background:
+                raise ValueError("Slab workers need the 'steps' engine with walls, no neighbor list "
+                                 "and no background process")
+
+        # With a window, physics can run in a separate process that owns the output files
+        self.background = background and not headless
+        self.worker_options = {}
+        if self.background:
+            self.worker_options = {'spill_path': spill_path, 'record_path': record_path, 'record_every': record_every,
+                                   'checkpoint_path': checkpoint_path, 'checkpoint_every': checkpoint_every}
+            spill_path = record_path = checkpoint_path = None
+
+        # Preallocated series (or a ring of the last `history` samples) plus online estimators
+        self.step_count = 0
+        capacity = history if history else -(-total_steps // max(1, decimate))
+        self.stats = StatsRecorder(capacity, decimate, spill_path)
+        # 'wall', 'window' or 'virial'; with pressure_tolerance the run ends early once the
+        # block-averaged pressure has a relative standard error below the tolerance
+        self.pressure = PressureEstimator(pressure_estimator, box_size, pressure_window)
+        self.pressure_tolerance = pressure_tolerance
+
+        # Optional trajectory file holding positions and velocities every record_every steps
+        self.recorder = None
+        self.recorder_state = {}
+        if record_path:
+            self.recorder = TrajectoryRecorder(record_path, len(self.store), box_size, particle_radius,
+                                               dt, record_every)
+
+        # Periodic checkpoints every checkpoint_every steps; 'c' in the window saves one on demand
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+
+        # Per-phase timers; 'p' in the window toggles them together with their HUD
+        self.profiler = StepProfiler(enabled=profile)
+        self.profile_path = profile_path
+
+        # Headless runs never open a window and write their series to output_path
+        self.headless = headless
+        self.output_path = output_path
+        self.screen = None
+        # Physics steps per rendered frame, or 'auto' for as many as fit in the frame budget
+        self.substeps = substeps
+        self.fps = fps
+        # Cached-sprite renderer; speed colours saturate at three thermal speeds
+        self.renderer = None
+        if not headless:
+            self.renderer = SpriteRenderer(color_by_speed=color_by_speed,
+                                           max_speed=3 * np.sqrt(self.kb * temperature / self.mass))
+            # Above lod_threshold particles, draw a density field instead of individual discs
+            if len(self.store) > lod_threshold:
+                self.renderer = DensityRenderer(box_size, (box_size, box_size),
+                                                temperature_overlay=temperature_overlay,
+                                                max_temperature=2 * temperature)
+            # Screen setup
+            pygame.init()
+            width = box_size + (PLOT_PANEL_WIDTH if live_plots else 0)
+            self.screen = pygame.display.set_mode((width, box_size))
+            pygame.display.set_caption('Ideal Gas Simulation')
+
+        # Live strip charts in a panel right of the box replace the post-run matplotlib plot
+        self.charts = []
+        if live_plots and not headless:
+            font = get_font('Arial', 14)
+            height = (box_size - 30) // 2
+            self.charts = [
+                StripChart((box_size + 10, 10, PLOT_PANEL_WIDTH - 20, height), 'Temperature', (255, 80, 80), font),
+                StripChart((box_size + 10, 20 + height, PLOT_PANEL_WIDTH - 20, height), 'Pressure', (80, 255, 80), font),
+            ]
+
+        # Worker processes and shared memory come last, once every argument has been accepted
+        if slab_workers and slab_workers > 1:
+            self.start_slab_workers()
 
     def initialize_particles(self):
         positions = self.initialize_positions()
-        velocities = self.initialize_velocities()
-        for pos, vel in zip(positions, velocities):
-            particle = Particle(pos, vel, self.mass, self.particle_radius)
-            self.particles.append(particle)
+        velocities = self.initialize_velocities()[:len(positions)]
+        self.store = ParticleStore(positions, velocities, self.mass, self.particle_radius, self.dtype)
+
+    @property
+    def particles(self):
+        # Per-particle views kept for code that still walks particles one by one
+        return [Particle(self.store, i) for i in range(len(self.store))]
 
     def initialize_positions(self):
-        positions = []
-        attempts = 0
-        max_attempts = self.num_particles * 100
-        while len(positions) < self.num_particles and attempts < max_attempts:
-            new_pos = np.random.uniform(self.particle_radius, self.box_size - self.particle_radius, 2)
-            if all(np.linalg.norm(new_pos - pos) >= 2 * self.particle_radius for pos in positions):
-                positions.append(new_pos)
-            attempts += 1
-        if attempts == max_attempts:
-            print("Warning: Could not place all particles without overlap.")
-        return positions
+        # Poisson-disk sampling or a jittered lattice; raises ValueError if the density is impossible
+        return place_particles(self.num_particles, self.box_size, self.particle_radius, self.rng, self.placement)
 
     def initialize_velocities(self):
         std_dev = np.sqrt(self.kb * self.temperature / self.mass)
-        velocities = np.random.normal(0, std_dev, (self.num_particles, 2))
+        velocities = self.rng.normal(0, std_dev, (self.num_particles, 2))
         return velocities
 
+    def step(self):
+        """Advance the physics by one step and record temperature and pressure."""
+        profiler = self.profiler
+        t0 = profiler.start()
+        dt = self.dt
+        kinetic_energy = None
+        if self.events is not None:
+            # Jump from event to event until the next sampling time
+            wall_collision_impulse = self.events.advance(dt)
+            t0 = profiler.lap('events', t0)
+        else:
+            if self.adaptive_dt:
+                dt = self.step_size()
+            if self.parallel is not None:
+                # Slab workers move, reflect and collide; impulse and energy are summed here
+                wall_collision_impulse, kinetic_energy = self.parallel.step(dt)
+            else:
+                # Update positions
+                self.store.move(dt)
+                t0 = profiler.lap('move', t0)
+
+                # Collision detection with walls, or wrapping around the periodic box
+                if self.periodic:
+                    self.store.wrap(self.box_size)
+                    wall_collision_impulse = 0.0
+                else:
+                    wall_collision_impulse = self.store.wall_collision(self.box_size)
+                t0 = profiler.lap('walls', t0)
+
+                # Collision detection between particles
+                self.handle_particle_collisions()
+            t0 = profiler.lap('collisions', t0)
+            profiler.count('pair_checks', self.collider.pair_checks)
+            profiler.count('collision_count', self.collider.collisions)
+
+        # Calculate statistics
+        if kinetic_energy is None:
+            kinetic_energy = self.store.kinetic_energy()
+        current_temperature = kinetic_energy / (self.num_particles * self.kb)
+        virial = (self.collider if self.events is None else self.events).virial
+        pressure = self.pressure.estimate(wall_collision_impulse, virial, kinetic_energy, dt)
+        # Samples are stamped with the time at the start of their step; error bars use
+        # the unwindowed pressure
+        self.stats.record(current_temperature, pressure, self.time, self.pressure.sample)
+        if self.recorder is not None:
+            self.recorder.record(self.step_count, self.time, self.store.positions, self.store.velocities)
+        profiler.lap('statistics', t0)
+
+        self.step_count += 1
+        self.time += dt
+        self.last_dt = dt
+        if self.checkpoint_every and self.checkpoint_path and self.step_count % self.checkpoint_every == 0:
+            self.save_checkpoint()
+        return current_temperature, pressure
+
+    def finished(self):
+        if self.step_count >= self.total_steps:
+            return True
+        return bool(self.pressure_tolerance) and self.stats.converged('pressure', self.pressure_tolerance)
+
+    def step_size(self):
+        # Largest dt (up to self.dt) that keeps the fastest particle within its displacement limit
+        speed_sq = np.einsum('ij,ij->i', self.store.velocities, self.store.velocities).max()
+        if speed_sq <= 0:
+            return self.dt
+        return min(self.dt, float(self.adaptive_dt * self.particle_radius / np.sqrt(speed_sq)))
+
+    def save_checkpoint(self, path=None):
+        save_checkpoint(self, path or self.checkpoint_path)
+
+    @classmethod
+    def from_checkpoint(cls, path, **overrides):
+        """Resume a run from a checkpoint; keyword overrides fork it into a variant.
+
+        Without overrides the resumed run continues bit-for-bit as if it had never stopped.
+        """
+        meta, arrays = load_checkpoint(path)
+        params = dict(meta['params'])
+        params.update(overrides)
+        simulation = cls(**params)
+        try:
+            simulation.restore(meta, arrays)
+        except BaseException:
+            if simulation.parallel is not None:
+                simulation.parallel.close()
+            raise
+        return simulation
+
+    def start_slab_workers(self):
+        self.parallel = self.collider = SlabEngine(self.store, self.box_size, self.slab_workers,
+                                                   self.params['seed'], self.cell_size)
+
+    def restore(self, meta, arrays):
+        store = arrays['store']
+        if len(store['positions']) == len(self.store):
+            np.copyto(self.store.positions, store['positions'])
+            np.copyto(self.store.velocities, store['velocities'])
+            np.copyto(self.store.masses, store['masses'])
+            np.copyto(self.store.radii, store['radii'])
+        else:
+            self.store = ParticleStore(store['positions'], store['velocities'], store['masses'], store['radii'],
+                                       self.dtype)
+            if self.events is not None:
+                self.events.store = self.store
+            if self.parallel is not None:
+                self.parallel.close()
+                self.start_slab_workers()
+        self.step_count = meta['step_count']
+        self.time = meta['time']
+
+        rng = meta['rng']
+        if 'generator' in rng and self.rng is np.random:
+            self.rng = np.random.default_rng()
+            self.collider.rng = self.rng
+        restore_rng_state(self.rng, rng)
+
+        self.stats.load_state(arrays['stats'])
+        self.pressure.load_state(arrays['pressure'])
+        self.collider.load_state(arrays['collider'])
+        if self.recorder is not None:
+            self.recorder.load_state(arrays['recorder'])
+        else:
+            self.recorder_state = arrays['recorder']
+        if self.events is not None:
+            if arrays['events']:
+                self.events.load_state(arrays['events'])
+            else:
+                self.events.time = self.time
+                self.events.reset()
+
+    def close(self):
+        # Flush statistics, finish the trajectory file and stop any slab workers
+        self.stats.close()
+        if self.parallel is not None:
+            self.parallel.close()
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+        if self.profile_path and any(self.profiler.counts.values()):
+            self.profiler.dump(self.profile_path)
+
+    @property
+    def times(self):
+        return self.stats.times()
+
+    @property
+    def temperatures(self):
+        return self.stats.column('temperature')
+
+    @property
+    def pressures(self):
+        return self.stats.column('pressure')
+
     def run(self):
+        if self.headless:
+            self.run_headless()
+            return
+        if self.background:
+            self.run_background()
+            return
+
         clock = pygame.time.Clock()
-        step = 0
+        frame_budget = 1.0 / self.fps
+        draw_time = 0.0
 
-        while step < self.total_steps:
+        while not self.finished():
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
+                    # Keep the state of an interrupted run if checkpoints are enabled
+                    if self.checkpoint_path:
+                        self.save_checkpoint()
                     pygame.quit()
+                    self.close()
                     return
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_c and self.checkpoint_path:
+                    self.save_checkpoint()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_t and isinstance(self.renderer, DensityRenderer):
+                    self.renderer.temperature_overlay = not self.renderer.temperature_overlay
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                    self.profiler.enabled = not self.profiler.enabled
+
+            # Run a fixed number of physics steps per frame; the recorded series
+            # only depends on dt, never on how the steps are spread over frames
+            frame_start = time.perf_counter()
+            physics_budget = frame_budget - draw_time
+            substeps = 0
+            while not self.finished():
+                step_start = self.time
+                current_temperature, pressure = self.step()
+                for chart, value in zip(self.charts, (current_temperature, pressure)):
+                    chart.add(value, step_start)
+                substeps += 1
+                if self.substeps == 'auto':
+                    if time.perf_counter() - frame_start >= physics_budget:
+                        break
+                elif substeps >= self.substeps:
+                    break
+
+            # Draw once per frame
+            draw_start = time.perf_counter()
+            self.draw_frame(current_temperature, pressure)
+            draw_time = time.perf_counter() - draw_start
+            clock.tick(self.fps)  # Limit the frame rate, not the physics
 
-            # Clear screen
-            self.screen.fill(BLACK)
-
-            # Update positions
-            for particle in self.particles:
-                particle.move(self.dt)
-
-            # Reset wall collision impulse
-            wall_collision_impulse = 0.0
-
-            # Collision detection with walls
-            for particle in self.particles:
-                impulse = particle.wall_collision(self.box_size)
-                wall_collision_impulse += impulse
-
-            # Collision detection between particles
-            self.handle_particle_collisions()
-
-            # Draw particles
-            for particle in self.particles:
-                particle.draw(self.screen)
-
-            # Calculate statistics
-            current_time = step * self.dt
-            kinetic_energy = 0.5 * sum(p.mass * np.linalg.norm(p.velocity) ** 2 for p in self.particles)
-            current_temperature = kinetic_energy / (self.num_particles * self.kb)
-            self.temperatures.append(current_temperature)
-            self.times.append(current_time)
-
-            pressure = wall_collision_impulse / (self.dt * 4 * self.box_size)
-            self.pressures.append(pressure)
-
-            if self.display_stats:
-                # Display temperature and pressure
-                font = pygame.font.SysFont('Arial', 18)
-                temp_text = font.render(f'Temperature: {current_temperature:.2f}', True, WHITE)
-                pres_text = font.render(f'Pressure: {pressure:.2f}', True, WHITE)
-                particle_text = font.render(f'Particles: {self.num_particles}', True, WHITE)
-                self.screen.blit(temp_text, (10, 10))
-                self.screen.blit(pres_text, (10, 30))
-                self.screen.blit(particle_text, (10, 50))
-
-            pygame.display.flip()
-            clock.tick(60)  # Limit to 60 FPS
-            step += 1
+        pygame.quit()
+        self.close()
+        if not self.charts:
+            self.plot_results()
 
+    def run_background(self):
+        # Physics steps in another process; this loop only shows its newest complete snapshot
+        physics = PhysicsProcess(self, self.worker_options)
+        clock = pygame.time.Clock()
+        current_temperature = self.store.kinetic_energy() / (len(self.store) * self.kb)
+        pressure = 0.0
+        last_step = None
+        quit_requested = False
+        while not physics.done:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    # The worker checkpoints on stop if checkpoints are enabled
+                    physics.stop()
+                    quit_requested = True
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_c:
+                    physics.request_checkpoint()
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_t and isinstance(self.renderer, DensityRenderer):
+                    self.renderer.temperature_overlay = not self.renderer.temperature_overlay
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+                    self.profiler.enabled = not self.profiler.enabled
+            if quit_requested:
+                break
+
+            snapshot = physics.latest(self.store)
+            if snapshot is not None and snapshot[0] != last_step:
+                step, snapshot_time, current_temperature, pressure = snapshot
+                if last_step is not None:
+                    # Mean step length since the last snapshot shown, for the HUD
+                    self.last_dt = (snapshot_time - self.time) / (step - last_step)
+                last_step = step
+                self.step_count = int(step)
+                self.time = float(snapshot_time)
+                # The charts get one sample per snapshot shown, stamped with its time
+                for chart, value in zip(self.charts, (current_temperature, pressure)):
+                    chart.add(value, self.time)
+            self.draw_frame(current_temperature, pressure)
+            clock.tick(self.fps)
+
+        # Take over the worker's statistics so results and plots work as for a local run
+        result = physics.finish()
+        self.step_count = result['step_count']
+        self.time = result['time']
+        self.stats.load_state(result['stats'])
         pygame.quit()
-        self.plot_results()
+        self.close()
+        if not quit_requested and not self.charts:
+            self.plot_results()
+
+    def draw_frame(self, current_temperature, pressure):
+        profiler = self.profiler
+        t0 = profiler.start()
+        self.screen.fill(BLACK)
+        self.renderer.draw(self.screen, self.store)
+        t0 = profiler.lap('draw', t0)
+
+        if self.display_stats:
+            self.draw_stats(current_temperature, pressure)
+        for chart in self.charts:
+            chart.draw(self.screen)
+        if profiler.enabled:
+            self.draw_profile()
+        t0 = profiler.lap('text', t0)
+
+        pygame.display.flip()
+        profiler.lap('flip', t0)
+
+    def run_headless(self):
+        # No window, no frame cap: step as fast as the CPU allows
+        try:
+            while not self.finished():
+                self.step()
+        except KeyboardInterrupt:
+            if self.checkpoint_path:
+                self.save_checkpoint()
+            raise
+        finally:
+            # Output files stay readable after an interrupt; a resume overwrites
+            # whatever was written after the checkpoint
+            self.close()
+        if self.output_path:
+            self.save_results(self.output_path)
+
+    def draw_stats(self, current_temperature, pressure):
+        # Display temperature and pressure
+        font = get_font('Arial', 18)
+        temp_text = render_text(f'Temperature: {current_temperature:.2f}', font, WHITE)
+        pres_text = render_text(f'Pressure: {pressure:.2f}', font, WHITE)
+        particle_text = render_text(f'Particles: {self.num_particles}', font, WHITE)
+        self.screen.blit(temp_text, (10, 10))
+        self.screen.blit(pres_text, (10, 30))
+        self.screen.blit(particle_text, (10, 50))
+        if isinstance(self.collider, NeighborListEngine):
+            neighbor_text = render_text(f'Neighbor pairs: {self.collider.pair_count} '
+                                        f'(rebuild rate {self.collider.rebuild_rate:.2f})', font, WHITE)
+            self.screen.blit(neighbor_text, (10, 70))
+        if self.adaptive_dt:
+            dt_text = render_text(f'dt: {self.last_dt:.3g}  t: {self.time:.1f}', font, WHITE)
+            self.screen.blit(dt_text, (10, 90))
+
+    def draw_profile(self):
+        # Rolling medians per phase, right-aligned at the top of the box
+        font = get_font('Arial', 14)
+        for row, line in enumerate(self.profiler.hud_lines()):
+            text = render_text(line, font, WHITE)
+            self.screen.blit(text, (self.box_size - text.get_width() - 10, 10 + 16 * row))
 
     def handle_particle_collisions(self):
-        # Spatial partitioning grid
-        grid_size = 20  # Adjust grid size for performance
-        cell_size = self.box_size / grid_size
-        grid_cells = [[[] for _ in range(grid_size)] for _ in range(grid_size)]
-
-        # Assign particles to grid cells
-        for idx, particle in enumerate(self.particles):
-            x_cell = int(particle.position[0] / cell_size)
-            y_cell = int(particle.position[1] / cell_size)
-            grid_cells[x_cell % grid_size][y_cell % grid_size].append(idx)
-
-        # Collision detection between particles using spatial partitioning
-        for x in range(grid_size):
-            for y in range(grid_size):
-                # Get particles in the current cell and neighboring cells
-                nearby_cells = [(x + dx) % grid_size for dx in (-1, 0, 1)]
-                nearby_cells = [(xc, (y + dy) % grid_size) for xc in nearby_cells for dy in (-1, 0, 1)]
-                cell_particles = []
-                for xc, yc in nearby_cells:
-                    cell_particles.extend(grid_cells[xc][yc])
-                # Check collisions among particles in cell_particles
-                for i_idx in grid_cells[x][y]:
-                    for j_idx in cell_particles:
-                        if i_idx < j_idx:
-                            p1 = self.particles[i_idx]
-                            p2 = self.particles[j_idx]
-                            delta_pos = p1.position - p2.position
-                            dist_sq = np.dot(delta_pos, delta_pos)
-                            min_dist = p1.radius + p2.radius
-                            if dist_sq <= min_dist ** 2:
-                                distance = np.sqrt(dist_sq)
-                                if distance == 0:
-                                    # Prevent division by zero
-                                    distance = min_dist
-                                    delta_pos = min_dist * np.random.uniform(-1, 1, size=2)
-                                overlap = 0.5 * (min_dist - distance)
-                                correction = (overlap / distance) * delta_pos
-                                p1.position += correction
-                                p2.position -= correction
-
-                                # Update velocities
-                                delta_vel = p1.velocity - p2.velocity
-                                norm_delta_pos = delta_pos / distance
-                                rel_vel = np.dot(delta_vel, norm_delta_pos)
-                                if rel_vel < 0:
-                                    m1 = p1.mass
-                                    m2 = p2.mass
-                                    impulse = (2 * rel_vel) / (1 / m1 + 1 / m2)
-                                    p1.velocity -= (impulse / m1) * norm_delta_pos
-                                    p2.velocity += (impulse / m2) * norm_delta_pos
+        # Cell-list binning, batched distance tests and impulse resolution over all pairs
+        return self.collider.resolve(self.store)
 
     def plot_results(self):
         # Plot final statistics using Matplotlib
@@ -209,3 +522,15 @@ class Simulation:
 
         plt.tight_layout()
         plt.show()
+
+    def export_live_plots(self, path):
+        # Decimated series behind the live charts, for plots.plot_exported
+        export_decimated(path, self.charts)
+
+    def save_results(self, path):
+        # Write the time series to disk: .npz for NumPy, anything else as CSV
+        series = np.column_stack((self.times, self.temperatures, self.pressures))
+        if str(path).endswith('.npz'):
+            np.savez(path, times=series[:, 0], temperatures=series[:, 1], pressures=series[:, 2])
+        else:
+            np.savetxt(path, series, delimiter=',', header='time,temperature,pressure', comments='')
@@ -0,0 +1,295 @@
+# stats.py
+import os
+import numpy as np
+
+
+class RunningStats:
+    """Welford's online mean and variance, one value per channel."""
+
+    def __init__(self, channels=1):
+        self.count = 0
+        self.mean = np.zeros(channels)
+        self._m2 = np.zeros(channels)
+
+    def add(self, values):
+        self.count += 1
+        delta = values - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (values - self.mean)
+
+    @property
+    def variance(self):
+        return self._m2 / (self.count - 1) if self.count > 1 else np.zeros_like(self.mean)
+
+
+class WindowedMean:
+    """Mean of the most recent `size` samples, kept with a ring buffer and a running sum."""
+
+    def __init__(self, size, channels=1):
+        self.size = size
+        self.values = np.zeros((size, channels))
+        self.total = np.zeros(channels)
+        self.count = 0
+
+    def add(self, values):
+        slot = self.count % self.size
+        self.total += values - self.values[slot]
+        self.values[slot] = values
+        self.count += 1
+
+    @property
+    def mean(self):
+        filled = min(self.count, self.size)
+        return self.total / filled if filled else np.zeros_like(self.total)
+
+
+class BlockAverage:
+    """Averages consecutive blocks of samples; the spread of block means gives an error bar."""
+
+    def __init__(self, block_size, channels=1):
+        self.block_size = block_size
+        self.block_sum = np.zeros(channels)
+        self.in_block = 0
+        self.blocks = RunningStats(channels)
+
+    def add(self, values):
+        self.block_sum += values
+        self.in_block += 1
+        if self.in_block == self.block_size:
+            self.blocks.add(self.block_sum / self.block_size)
+            self.block_sum[:] = 0
+            self.in_block = 0
+
+    @property
+    def mean(self):
+        return self.blocks.mean
+
+    @property
+    def standard_error(self):
+        if self.blocks.count < 2:
+            return np.full_like(self.blocks.mean, np.inf)
+        return np.sqrt(self.blocks.variance / self.blocks.count)
+
+
+class SeriesBuffer:
+    """Fixed-size ring buffer for multi-channel time series with decimation and spill-to-disk.
+
+    Only every `decimate`-th sample is stored. Once the ring has been filled, the oldest
+    samples are overwritten; if `spill_path` is set, rows are appended to that file as raw
+    float64 before they are overwritten, so the full decimated series survives on disk.
+    The file is written from the first flush on, so a run restored from a checkpoint
+    keeps the rows its earlier run spilled and continues after them.
+    """
+
+    def __init__(self, capacity, channels, decimate=1, spill_path=None):
+        self.capacity = max(1, capacity)
+        self.channels = channels
+        self.decimate = max(1, decimate)
+        self.data = np.empty((self.capacity, channels))
+        self.count = 0          # Samples stored (after decimation)
+        self.offered = 0        # Samples offered (before decimation)
+        self.spill_path = spill_path
+        self.spill_start = 0    # Row index of the first row in the spill file
+        self.spilled = 0
+
+    def append(self, values):
+        self.offered += 1
+        if (self.offered - 1) % self.decimate:
+            return
+        self.data[self.count % self.capacity] = values
+        self.count += 1
+        # Spill before the ring wraps onto rows that aren't on disk yet
+        if self.spill_path and self.count - self.spilled == self.capacity:
+            self.flush()
+
+    def flush(self):
+        """Write samples not yet spilled so the file holds the whole decimated series."""
+        if not self.spill_path:
+            return
+        start = self.spilled % self.capacity
+        end = start + self.count - self.spilled
+        # Anything past the spilled rows was written by an interrupted run after its checkpoint
+        mode = 'r+b' if self.spilled > self.spill_start else 'wb'
+        with open(self.spill_path, mode) as f:
+            f.seek((self.spilled - self.spill_start) * self.row_bytes)
+            f.truncate()
+            self.data[start:min(end, self.capacity)].tofile(f)
+            if end > self.capacity:
+                self.data[:end - self.capacity].tofile(f)
+        self.spilled = self.count
+
+    @property
+    def row_bytes(self):
+        return self.channels * self.data.itemsize
+
+    def spilled_rows(self):
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        return os.path.getsize(self.spill_path) // self.row_bytes
+
+    def sample_indices(self):
+        """Indices (in offered samples, i.e. steps) of the retained rows, oldest first."""
+        retained = min(self.count, self.capacity)
+        return np.arange(self.count - retained, self.count) * self.decimate
+
+    def values(self):
+        """Retained rows in chronological order."""
+        if self.count <= self.capacity:
+            return self.data[:self.count]
+        split = self.count % self.capacity
+        return np.concatenate((self.data[split:], self.data[:split]))
+
+    def state(self):
+        return {'values': self.values(), 'counters': np.array([self.count, self.offered])}
+
+    def load_state(self, state):
+        self.count, self.offered = (int(v) for v in state['counters'])
+        values = state['values'][-self.capacity:]
+        slots = np.arange(self.count - len(values), self.count) % self.capacity
+        self.data[slots] = values
+        # Continue the earlier run's spill file after the rows it already holds; a new
+        # or shorter file starts over with the oldest retained row
+        on_disk = self.spilled_rows()
+        if on_disk >= self.count - len(values):
+            self.spill_start = 0
+            self.spilled = min(on_disk, self.count)
+        else:
+            self.spill_start = self.spilled = self.count - len(values)
+
+    @staticmethod
+    def load_spill(path, channels):
+        return np.fromfile(path, dtype=float).reshape(-1, channels)
+
+
+class PressureEstimator:
+    """Turns one step's wall impulse or pair virial into a pressure sample.
+
+    'wall' divides the step's wall impulse by its duration and the box perimeter, as
+    the simulation always did. 'window' does the same over the last `window` steps,
+    which removes most of the step-to-step noise. 'virial' uses the kinetic energy plus
+    the virial of the pair collision impulses (2D: PA = KE + sum(r_ij . J_ij) / 2dt),
+    which samples every collision in the bulk rather than only those at the walls.
+    `sample` holds the last step's pressure before any windowing, for error estimates
+    that need uncorrelated inputs.
+    """
+
+    METHODS = ('wall', 'window', 'virial')
+
+    def __init__(self, method, box_size, window=100):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown pressure estimator: {method}")
+        self.method = method
+        self.box_size = box_size
+        self.window = WindowedMean(window, 2) if method == 'window' else None
+        self._row = np.empty(2)
+        self.sample = 0.0
+
+    def estimate(self, wall_impulse, virial, kinetic_energy, dt):
+        if self.method == 'virial':
+            self.sample = (kinetic_energy + virial / (2 * dt)) / self.box_size ** 2
+            return self.sample
+        self.sample = wall_impulse / (dt * 4 * self.box_size)
+        if self.method == 'window':
+            row = self._row
+            row[0] = wall_impulse
+            row[1] = dt
+            self.window.add(row)
+            wall_impulse, dt = self.window.total
+        return wall_impulse / (dt * 4 * self.box_size)
+
+    def state(self):
+        if self.window is None:
+            return {}
+        return {'window_values': self.window.values, 'window_total': self.window.total,
+                'window_count': np.array([self.window.count])}
+
+    def load_state(self, state):
+        if self.window is not None and state:
+            self.window.values = state['window_values'].copy()
+            self.window.total = state['window_total'].copy()
+            self.window.count = int(state['window_count'][0])
+
+
+class StatsRecorder:
+    """Bounded-memory record of temperature and pressure with online estimators.
+
+    The simulated time of every stored sample is kept alongside, since steps need not
+    all have the same length; with `spill_path` those times are spilled as well, to
+    `spill_path` + '.time', one float64 per row of the main file.
+
+    The block averages take the raw per-step pressure when one is given: windowed
+    samples overlap, so blocks of them would look less noisy than the data really is
+    and understate the standard error.
+    """
+
+    CHANNELS = ('temperature', 'pressure')
+
+    def __init__(self, capacity, decimate=1, spill_path=None, window=100, block_size=100):
+        channels = len(self.CHANNELS)
+        self.series = SeriesBuffer(capacity, channels, decimate, spill_path)
+        self.time_series = SeriesBuffer(capacity, 1, decimate, spill_path and spill_path + '.time')
+        self.running = RunningStats(channels)
+        self.window = WindowedMean(window, channels)
+        self.blocks = BlockAverage(block_size, channels)
+        self._row = np.empty(channels)
+        self._raw = np.empty(channels)
+
+    def record(self, temperature, pressure, time, raw_pressure=None):
+        row = self._row
+        row[0] = temperature
+        row[1] = pressure
+        self.series.append(row)
+        self.time_series.append(time)
+        self.running.add(row)
+        self.window.add(row)
+        if raw_pressure is not None:
+            raw = self._raw
+            raw[0] = temperature
+            raw[1] = raw_pressure
+            row = raw
+        self.blocks.add(row)
+
+    def state(self):
+        series = self.series.state()
+        return {
+            'series_values': series['values'],
+            'series_counters': series['counters'],
+            'time_values': self.time_series.values()[:, 0],
+            'running': np.vstack((self.running.mean, self.running._m2)),
+            'running_count': np.array([self.running.count]),
+            'window_values': self.window.values,
+            'window_total': self.window.total,
+            'window_count': np.array([self.window.count]),
+            'block_sum': self.blocks.block_sum,
+            'block_counts': np.array([self.blocks.in_block, self.blocks.blocks.count]),
+            'block_running': np.vstack((self.blocks.blocks.mean, self.blocks.blocks._m2)),
+        }
+
+    def load_state(self, state):
+        self.series.load_state({'values': state['series_values'], 'counters': state['series_counters']})
+        self.time_series.load_state({'values': state['time_values'][:, None], 'counters': state['series_counters']})
+        self.running.mean, self.running._m2 = (row.copy() for row in state['running'])
+        self.running.count = int(state['running_count'][0])
+        self.window.values = state['window_values'].copy()
+        self.window.total = state['window_total'].copy()
+        self.window.count = int(state['window_count'][0])
+        self.blocks.block_sum = state['block_sum'].copy()
+        self.blocks.in_block, self.blocks.blocks.count = (int(v) for v in state['block_counts'])
+        self.blocks.blocks.mean, self.blocks.blocks._m2 = (row.copy() for row in state['block_running'])
+
+    def times(self):
+        return self.time_series.values()[:, 0]
+
+    def converged(self, channel, tolerance, min_blocks=10):
+        """True once the block-averaged standard error of `channel` is within `tolerance` of its mean."""
+        k = self.CHANNELS.index(channel)
+        if self.blocks.blocks.count < min_blocks:
+            return False
+        return self.blocks.standard_error[k] <= tolerance * abs(self.blocks.mean[k])
+
+    def column(self, name):
+        return self.series.values()[:, self.CHANNELS.index(name)]
+
+    def close(self):
+        self.series.flush()
+        self.time_series.flush()
@@ -0,0 +1,145 @@
+# sweep.py
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+CACHE_PATH = 'sweep_cache.db'
+
+# Source files whose contents change simulation results; editing any of them invalidates the cache
+PHYSICS_MODULES = ('simulation.py', 'particles.py', 'collisions.py', 'events.py', 'placement.py',
+                   'stats.py')
+
+
+def code_version():
+    """Hash of the physics sources, stored with every cached point."""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in PHYSICS_MODULES:
+        with open(os.path.join(here, name), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def parameter_grid(base, axes):
+    """Expand `axes` ({name: [values]}) into one parameter dict per grid point."""
+    names = sorted(axes)
+    points = []
+    for values in itertools.product(*(axes[name] for name in names)):
+        params = dict(base)
+        params.update(zip(names, values))
+        points.append(params)
+    return points
+
+
+def cache_key(params, seed, version):
+    blob = json.dumps({'params': params, 'seed': seed, 'version': version}, sort_keys=True)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+def init_cache(path=CACHE_PATH):
+    """Create the results table if it doesn't exist."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sweep_results (
+            key TEXT PRIMARY KEY,
+            params TEXT,
+            seed INTEGER,
+            code_version TEXT,
+            pressure REAL,
+            temperature REAL
+        )
+    ''')
+    conn.commit()
+    conn.close()
+
+
+def load_cached(keys, path=CACHE_PATH):
+    """Return {key: (pressure, temperature)} for the keys already in the cache."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    found = {}
+    for key in keys:
+        cursor.execute("SELECT pressure, temperature FROM sweep_results WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        if row:
+            found[key] = row
+    conn.close()
+    return found
+
+
+def store_result(key, params, seed, version, pressure, temperature, path=CACHE_PATH):
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.execute(
+        "INSERT OR REPLACE INTO sweep_results (key, params, seed, code_version, pressure, temperature) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        (key, json.dumps(params, sort_keys=True), seed, version, pressure, temperature)
+    )
+    conn.commit()
+    conn.close()
+
+
+def steady_state(params, seed, equilibration=0.5):
+    """Run one point headlessly and average pressure and temperature after equilibration."""
+    from simulation import Simulation
+    simulation = Simulation(**params, headless=True, seed=seed)
+    simulation.run()
+    start = int(len(simulation.pressures) * equilibration)
+    # Weight each sample by its step length, which varies with adaptive dt
+    durations = np.diff(np.append(simulation.times, simulation.time))[start:]
+    pressure = float(np.average(simulation.pressures[start:], weights=durations))
+    temperature = float(np.average(simulation.temperatures[start:], weights=durations))
+    return pressure, temperature
+
+
+def run_sweep(base, axes, seed=0, max_workers=None, cache_path=CACHE_PATH, equilibration=0.5):
+    """Run every grid point not already cached and return the equation-of-state table.
+
+    Each row compares P*V against N*k*T, where V is the box area and T the measured
+    steady-state temperature; for an ideal gas the ratio is 1.
+    """
+    init_cache(cache_path)
+    version = code_version()
+    points = parameter_grid(base, axes)
+    keys = [cache_key(params, seed, version) for params in points]
+    results = load_cached(keys, cache_path)
+
+    missing = [k for k, key in enumerate(keys) if key not in results]
+    if missing:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(steady_state, points[k], seed, equilibration): k for k in missing}
+            for future in as_completed(futures):
+                k = futures[future]
+                results[keys[k]] = future.result()
+                store_result(keys[k], points[k], seed, version, *results[keys[k]], path=cache_path)
+
+    table = []
+    for params, key in zip(points, keys):
+        pressure, temperature = results[key]
+        pv = pressure * params['box_size'] ** 2
+        nkt = params['num_particles'] * temperature  # Boltzmann constant is 1 in simulation units
+        table.append({
+            'num_particles': params['num_particles'],
+            'box_size': params['box_size'],
+            'temperature': params['temperature'],
+            'pressure': pressure,
+            'measured_temperature': temperature,
+            'PV': pv,
+            'NkT': nkt,
+            'ratio': pv / nkt if nkt else float('nan'),
+        })
+    return table, len(missing)
+
+
+def write_table(table, path):
+    """Export the sweep table as CSV."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=list(table[0]))
+        writer.writeheader()
+        writer.writerows(table)
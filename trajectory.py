@@ -0,0 +1,252 @@
+# trajectory.py
+import os
+import struct
+import numpy as np
+
+# Header: magic, version, particles, frames per chunk, record interval, box size, radius, dt,
+# number of frames and byte offset of the frame index (both filled in on close)
+HEADER = struct.Struct('<8sIIIIdddQQ')
+MAGIC = b'IGTRAJ01'
+VERSION = 1
+FRAME_DTYPE = np.float32  # x, y, vx, vy per particle
+
+
+class TrajectoryRecorder:
+    """Streams particle positions and velocities every `every` steps into a memory-mapped file.
+
+    The file grows one chunk of `frames_per_chunk` frames at a time and only the current
+    chunk is mapped, so memory use does not depend on the length of the run. Frames are
+    stored as float32 (x, y, vx, vy) rows; a frame index of (step, time) pairs follows the
+    last chunk and is written by close(). Until then the index is kept in NumPy arrays
+    that double in size when full, 16 bytes per frame. The file is created on the first
+    frame, so a run restored from a checkpoint can continue the earlier run's file
+    instead (load_state).
+    """
+
+    def __init__(self, path, num_particles, box_size, radius, dt, every=1, frames_per_chunk=256):
+        self.path = path
+        self.num_particles = num_particles
+        self.box_size = box_size
+        self.radius = radius
+        self.dt = dt
+        self.every = max(1, every)
+        self.frames_per_chunk = frames_per_chunk
+        self.frame_bytes = num_particles * 4 * np.dtype(FRAME_DTYPE).itemsize
+        self.num_frames = 0
+        self.steps = np.empty(frames_per_chunk, dtype=np.int64)
+        self.times = np.empty(frames_per_chunk)
+        self.chunk = None
+        self.started = False
+
+    def _start(self):
+        with open(self.path, 'wb') as f:
+            f.write(self._header(0, 0))
+        self.started = True
+
+    def _header(self, num_frames, index_offset):
+        return HEADER.pack(MAGIC, VERSION, self.num_particles, self.frames_per_chunk, self.every,
+                           self.box_size, self.radius, self.dt, num_frames, index_offset)
+
+    def state(self):
+        # Frames a checkpoint refers to must be on disk
+        if self.chunk is not None:
+            self.chunk.flush()
+        return {'steps': self.steps[:self.num_frames].copy(), 'times': self.times[:self.num_frames].copy()}
+
+    def load_state(self, state):
+        """Continue the file of the checkpointed run after its frames up to the checkpoint.
+
+        Frames the interrupted run wrote after the checkpoint are overwritten. If the
+        file is missing or was written with other settings, a new one is started.
+        """
+        if not state or not self._continues(len(state['steps'])):
+            return
+        self.num_frames = len(state['steps'])
+        self._reserve(self.num_frames)
+        self.steps[:self.num_frames] = state['steps']
+        self.times[:self.num_frames] = state['times']
+        self.started = True
+        # Mark the file unfinished until close() writes the new frame index
+        with open(self.path, 'r+b') as f:
+            f.write(self._header(0, 0))
+
+    def _continues(self, num_frames):
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < HEADER.size + num_frames * self.frame_bytes:
+            return False
+        with open(self.path, 'rb') as f:
+            fields = HEADER.unpack(f.read(HEADER.size))
+        return fields[:5] == (MAGIC, VERSION, self.num_particles, self.frames_per_chunk, self.every)
+
+    def _reserve(self, num_frames):
+        # Grow the index by doubling so appending stays amortized O(1)
+        if num_frames <= len(self.steps):
+            return
+        size = max(num_frames, 2 * len(self.steps))
+        self.steps = np.concatenate((self.steps, np.empty(size - len(self.steps), dtype=np.int64)))
+        self.times = np.concatenate((self.times, np.empty(size - len(self.times))))
+
+    def _map_chunk(self, first_frame):
+        offset = HEADER.size + first_frame * self.frame_bytes
+        with open(self.path, 'r+b') as f:
+            f.truncate(offset + self.frames_per_chunk * self.frame_bytes)
+        self.chunk = np.memmap(self.path, dtype=FRAME_DTYPE, mode='r+', offset=offset,
+                               shape=(self.frames_per_chunk, self.num_particles, 4))
+
+    def record(self, step, time, positions, velocities):
+        if step % self.every:
+            return
+        slot = self.num_frames % self.frames_per_chunk
+        if slot == 0 or self.chunk is None:
+            if self.chunk is not None:
+                self.chunk.flush()
+            if not self.started:
+                self._start()
+            self._map_chunk(self.num_frames - slot)
+        frame = self.chunk[slot]
+        frame[:, :2] = positions
+        frame[:, 2:] = velocities
+        self._reserve(self.num_frames + 1)
+        self.steps[self.num_frames] = step
+        self.times[self.num_frames] = time
+        self.num_frames += 1
+
+    def close(self):
+        """Trim the unused tail of the last chunk and append the frame index."""
+        if self.chunk is not None:
+            self.chunk.flush()
+            self.chunk = None
+        if not self.started:
+            self._start()
+        index_offset = HEADER.size + self.num_frames * self.frame_bytes
+        with open(self.path, 'r+b') as f:
+            f.truncate(index_offset)
+            f.seek(index_offset)
+            self.steps[:self.num_frames].tofile(f)
+            self.times[:self.num_frames].tofile(f)
+            f.seek(0)
+            f.write(self._header(self.num_frames, index_offset))
+
+
+class TrajectoryReader:
+    """Random access to recorded frames without loading the file into memory."""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            fields = HEADER.unpack(f.read(HEADER.size))
+        (magic, version, self.num_particles, self.frames_per_chunk, self.every,
+         self.box_size, self.radius, self.dt, self.num_frames, index_offset) = fields
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a trajectory file")
+        if index_offset == 0:
+            raise ValueError(f"{path} was not closed properly; no frame index")
+        if self.num_frames == 0:
+            self.frames = np.empty((0, self.num_particles, 4), dtype=FRAME_DTYPE)
+            self.steps = np.empty(0, dtype=np.int64)
+            self.times = np.empty(0)
+            return
+        self.frames = np.memmap(path, dtype=FRAME_DTYPE, mode='r', offset=HEADER.size,
+                                shape=(self.num_frames, self.num_particles, 4))
+        self.steps = np.memmap(path, dtype=np.int64, mode='r', offset=index_offset, shape=(self.num_frames,))
+        self.times = np.memmap(path, dtype=np.float64, mode='r', offset=index_offset + 8 * self.num_frames,
+                               shape=(self.num_frames,))
+
+    def __len__(self):
+        return self.num_frames
+
+    def positions(self, frame):
+        return self.frames[frame, :, :2]
+
+    def velocities(self, frame):
+        return self.frames[frame, :, 2:]
+
+    def frame_at_step(self, step):
+        """Index of the last recorded frame at or before `step`."""
+        return max(0, int(np.searchsorted(self.steps, step, side='right')) - 1)
+
+
+def replay(path, fps=60, lod_threshold=50000):
+    """Play back a trajectory file in a pygame window.
+
+    Space pauses, left/right step one frame (holding them scrubs), up/down change the
+    playback speed (negative plays backward), Home/End jump to the ends and clicking the
+    bar at the bottom seeks to that point. Nothing is recomputed. Frames are drawn by
+    the simulation's renderers, as a density field above `lod_threshold` particles.
+    """
+    import pygame
+    from constants import BLACK, WHITE, GRAY, BLUE
+    from particles import ParticleStore
+    from rendering import SpriteRenderer, DensityRenderer
+    from utils import get_font, render_text
+
+    reader = TrajectoryReader(path)
+    if not len(reader):
+        print(f"{path} holds no frames")
+        return
+    size = int(reader.box_size)
+    pygame.init()
+    screen = pygame.display.set_mode((size, size + 30))
+    pygame.display.set_caption('Ideal Gas Simulation - Replay')
+    font = get_font('Arial', 18)
+    clock = pygame.time.Clock()
+    bar_rect = pygame.Rect(10, size + 10, size - 20, 10)
+    # The renderers draw a ParticleStore; this one is refilled from each frame shown
+    store = ParticleStore(np.zeros((reader.num_particles, 2)), np.zeros((reader.num_particles, 2)), 1.0,
+                          reader.radius, dtype=FRAME_DTYPE)
+    if reader.num_particles > lod_threshold:
+        renderer = DensityRenderer(reader.box_size, (size, size))
+    else:
+        renderer = SpriteRenderer()
+
+    speeds = (-16, -8, -4, -2, -1, -0.5, -0.25, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+    speed_index = speeds.index(1)  # Speed is in recorded frames per rendered frame
+    position = 0.0  # Fractional frame index
+    paused = False
+    last = len(reader) - 1
+    run = True
+    while run:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                run = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    speed_index = min(speed_index + 1, len(speeds) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed_index = max(speed_index - 1, 0)
+                elif event.key == pygame.K_HOME:
+                    position = 0.0
+                elif event.key == pygame.K_END:
+                    position = float(last)
+            elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if bar_rect.collidepoint(event.pos):
+                    position = (event.pos[0] - bar_rect.x) / bar_rect.width * last
+
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_LEFT]:
+            position -= 1
+        elif keys[pygame.K_RIGHT]:
+            position += 1
+        elif not paused:
+            position += speeds[speed_index]
+        position = min(max(position, 0.0), float(last))
+
+        frame = int(position)
+        screen.fill(BLACK)
+        np.copyto(store.positions, reader.positions(frame))
+        renderer.draw(screen, store)
+
+        # Progress bar and status line
+        pygame.draw.rect(screen, GRAY, bar_rect)
+        filled = bar_rect.copy()
+        filled.width = int(bar_rect.width * frame / max(last, 1))
+        pygame.draw.rect(screen, BLUE, filled)
+        status = 'paused' if paused else f'{speeds[speed_index]:g}x'
+        text = render_text(f'Frame {frame}/{last}  step {reader.steps[frame]}  '
+                           f't={reader.times[frame]:.2f}  {status}', font, WHITE)
+        screen.blit(text, (10, 10))
+
+        pygame.display.flip()
+        clock.tick(fps)
+
+    pygame.quit()
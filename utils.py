@@ -1,10 +1,71 @@
 import pygame
+from collections import OrderedDict
+
+# Process-wide font registry: each (name, size, bold) is loaded from the system once
+_fonts = {}
+
+
+def clear_font_caches():
+    # Font objects die with pygame.quit(), so fonts and rendered text are dropped with them
+    _fonts.clear()
+    text_cache.clear()
+
+
+def get_font(name='Arial', size=18, bold=False):
+    key = (name, size, bold)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        if not _fonts:
+            pygame.register_quit(clear_font_caches)
+        font = pygame.font.SysFont(name, size, bold=bold)
+        _fonts[key] = font
+    return font
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by (text, font, colour, antialias)."""
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text, font, color, antialias=True):
+        key = (text, font, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.maxsize:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self.surfaces), 'fonts': len(_fonts)}
+
+
+text_cache = TextCache()
+
+
+def render_text(text, font, color, antialias=True):
+    return text_cache.render(text, font, color, antialias)
+
 
 def draw_text(text, font, color, surface, x, y, center=False):
-    text_obj = font.render(text, True, color)
+    text_obj = render_text(text, font, color)
     text_rect = text_obj.get_rect()
     if center:
         text_rect.center = (x, y)
     else:
         text_rect.topleft = (x, y)
-    surface.blit(text_obj, text_rect)
\ No newline at end of file
+    surface.blit(text_obj, text_rect)